@@ -2,20 +2,56 @@
 """
 Mock remote attestation verification service.
 
-Simulates the /attestation/is_confidential endpoint.
+Simulates the /attestation/is_confidential endpoint (plus a :batch variant).
 
 In production, this service cryptographically verifies TEE attestation tokens
 and returns encrypted ciphers. For testing, we just return a fixed cipher
 for any valid-looking token.
 """
+import logging
+import logging.handlers
 import os
-from typing import Optional
+import queue
+import sys
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
 
-app = FastAPI(title="Mock Attestation Service", version="1.0.0")
+logger = logging.getLogger("mock_attestation_service")
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    """
+    Route log records through a queue so handlers never block on stdout.
+
+    Runs in every worker process, so it also covers MOCK_WORKERS > 1.
+    """
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+
+
+app = FastAPI(
+    title="Mock Attestation Service",
+    version="1.0.0",
+    lifespan=_lifespan,
+)
 
 
 class AttestationRequest(BaseModel):
@@ -30,13 +66,19 @@ class AttestationResponse(BaseModel):
     cipher: str
 
 
+class BatchAttestationRequest(BaseModel):
+    """Request body for verifying several attestation tokens in one round-trip."""
+
+    tokens: List[str]
+
+
 # Fixed cipher for testing - represents successful TEE attestation
 # In production, this would be cryptographically generated based on attestation proof
 TEST_CIPHER = "a1b2c3d4e5f6789012345678901234567890abcdef1234567890abcdef123456"
 
 
 @app.post("/attestation/is_confidential", response_model=AttestationResponse)
-def verify_attestation(request: AttestationRequest):
+async def verify_attestation(request: AttestationRequest):
     """
     Verify attestation token and return cipher.
 
@@ -57,13 +99,39 @@ def verify_attestation(request: AttestationRequest):
 
     # For mock: any non-empty token is considered valid
     # Production would verify cryptographic signatures here
-    print(f"✓ Verified attestation token: {request.token[:20]}...")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("✓ Verified attestation token: %s...", request.token[:20])
 
     return AttestationResponse(cipher=TEST_CIPHER)
 
 
+@app.post("/attestation/is_confidential:batch", response_model=List[AttestationResponse])
+async def verify_attestation_batch(request: BatchAttestationRequest):
+    """
+    Verify several attestation tokens and return one cipher per token, in order.
+
+    Lets test harnesses that verify many tokens do it in a single request.
+
+    Args:
+        request: Batch request with tokens
+
+    Returns:
+        List of responses with encrypted ciphers
+
+    Raises:
+        HTTPException: If any token is invalid
+    """
+    if not all(request.tokens):
+        raise HTTPException(status_code=400, detail="All tokens must be non-empty")
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("✓ Verified %d attestation tokens", len(request.tokens))
+
+    return [AttestationResponse(cipher=TEST_CIPHER) for _ in request.tokens]
+
+
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "service": "mock-attestation"}
 
@@ -72,6 +140,18 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("ATTESTATION_PORT", "8001"))
-    print(f"Starting Mock Attestation Service on port {port}")
+    # For load tests, MOCK_WORKERS=2*ncores+1 is a reasonable starting point
+    workers = int(os.getenv("MOCK_WORKERS", "1"))
+    print(f"Starting Mock Attestation Service on port {port} ({workers} worker(s))")
     print(f"Endpoint: http://localhost:{port}/attestation/is_confidential")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # uvloop/httptools come with uvicorn[standard]; access logging is off to keep it out of the request path
+    # Multiple workers require the app as an import string (each worker imports it again)
+    uvicorn.run(
+        "mock_attestation_service:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+    )
@@ -12,13 +12,14 @@ For testing purposes:
 
 Real backend would verify the cipher cryptographically.
 """
-import json
+import operator
 import os
-from typing import Iterator, List, Optional
+from typing import Dict, Iterator, List, Optional
 
-from fastapi import Depends, FastAPI, Header, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+import msgspec
+import orjson
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 
 app = FastAPI(title="Mock Delong Datasets API", version="1.0.0")
@@ -75,9 +76,54 @@ SAMPLE_DATA = {
     "columns": ["patient_id", "age", "diagnosis", "tumor_size_mm"],
 }
 
+# Column name -> position lookups, built once so requests avoid list.index() scans
+MOCK_COLUMN_INDEX = {k: {c: i for i, c in enumerate(v["columns"])} for k, v in MOCK_DATASETS.items()}
+SAMPLE_COLUMN_INDEX = {c: i for i, c in enumerate(SAMPLE_DATA["columns"])}
+
+
+def _full_response(dataset: Dict, data_type: str) -> bytes:
+    """Serialize the response for an unfiltered, unpaginated decrypt request."""
+    total_rows = len(dataset["data"])
+    return orjson.dumps(
+        {
+            "data": dataset["data"],
+            "columns": dataset["columns"],
+            "row_count": total_rows,
+            "total_rows": total_rows,
+            "has_more": False,
+            "data_type": data_type,
+        }
+    )
+
+
+# The datasets never change, so "give me everything" responses are encoded once.
+# Keyed by (dataset_id, is_real_data); sample data is the same for every dataset.
+_SAMPLE_RESPONSE = _full_response(SAMPLE_DATA, "sample")
+PRECOMPUTED_RESPONSES = {
+    **{(k, True): _full_response(v, "real") for k, v in MOCK_DATASETS.items()},
+    **{(k, False): _SAMPLE_RESPONSE for k in MOCK_DATASETS},
+}
+
+
+def _project_columns(rows: List[List], column_index: Dict[str, int], columns: List[str]) -> List:
+    """
+    Select the given columns from each row.
+
+    Uses operator.itemgetter so the per-row projection runs in C.
+
+    Raises:
+        KeyError: If a column name is not in column_index
+    """
+    indices = [column_index[col] for col in columns]
+    if len(indices) == 1:
+        # itemgetter with a single index returns a scalar, not a tuple
+        idx = indices[0]
+        return [(row[idx],) for row in rows]
+    return list(map(operator.itemgetter(*indices), rows))
+
 
-class DecryptRequest(BaseModel):
-    """Request body for /api/datasets/decrypt"""
+class DecryptRequest(msgspec.Struct):
+    """Request body for /api/datasets/decrypt (decoded with msgspec, not Pydantic)"""
 
     dataset_id: str
     runtime_key: str
@@ -86,7 +132,10 @@ class DecryptRequest(BaseModel):
     limit: int = 1000
 
 
-def _require_bearer(authorization: Optional[str] = Header(None)) -> str:
+_decrypt_request_decoder = msgspec.json.Decoder(DecryptRequest)
+
+
+async def _require_bearer(authorization: Optional[str] = Header(None)) -> str:
     """Validate JWT bearer token."""
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing Authorization header")
@@ -117,12 +166,17 @@ def _verify_runtime_key(runtime_key: str) -> bool:
 
 
 @app.post("/api/datasets/decrypt")
-def decrypt_dataset(request: DecryptRequest, _token: str = Depends(_require_bearer)):
+async def decrypt_dataset(raw_request: Request, _token: str = Depends(_require_bearer)):
     """
     Decrypt and return dataset data.
 
     Matches real backend API specification.
     """
+    try:
+        request = _decrypt_request_decoder.decode(await raw_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid request body: {e}")
+
     # Validate dataset exists
     if request.dataset_id not in MOCK_DATASETS:
         raise HTTPException(status_code=404, detail=f"Dataset {request.dataset_id} not found")
@@ -133,62 +187,76 @@ def decrypt_dataset(request: DecryptRequest, _token: str = Depends(_require_bear
     # Select data source
     if is_real_data:
         dataset = MOCK_DATASETS[request.dataset_id]
+        column_index = MOCK_COLUMN_INDEX[request.dataset_id]
         data_type = "real"
     else:
         dataset = SAMPLE_DATA
+        column_index = SAMPLE_COLUMN_INDEX
         data_type = "sample"
 
     all_data = dataset["data"]
     all_columns = dataset["columns"]
 
-    # Apply column filtering
-    if request.columns:
-        try:
-            column_indices = [all_columns.index(col) for col in request.columns]
-            filtered_data = [[row[i] for i in column_indices] for row in all_data]
-            filtered_columns = request.columns
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"Invalid column name: {e}")
-    else:
-        filtered_data = all_data
-        filtered_columns = all_columns
+    # Whole dataset requested: send the pre-encoded body as-is
+    if not request.columns and request.offset == 0 and request.limit >= len(all_data):
+        return Response(
+            content=PRECOMPUTED_RESPONSES[(request.dataset_id, is_real_data)],
+            media_type="application/json",
+        )
 
-    # Apply pagination
-    total_rows = len(filtered_data)
+    # Apply pagination first, so column filtering only touches the returned page
+    total_rows = len(all_data)
     start = request.offset
     end = min(start + request.limit, total_rows)
-    paginated_data = filtered_data[start:end]
+    paginated_data = all_data[start:end]
     row_count = len(paginated_data)
     has_more = end < total_rows
 
-    return {
-        "data": paginated_data,
-        "columns": filtered_columns,
-        "row_count": row_count,
-        "total_rows": total_rows,
-        "has_more": has_more,
-        "data_type": data_type,
-    }
+    # Apply column filtering (no copy when all columns are requested in order)
+    if request.columns and request.columns != all_columns:
+        try:
+            paginated_data = _project_columns(paginated_data, column_index, request.columns)
+            filtered_columns = request.columns
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid column name: {e}")
+    else:
+        filtered_columns = all_columns
+
+    # Encode with orjson and return the bytes directly, so FastAPI skips
+    # response-model validation (ORJSONResponse is deprecated in FastAPI)
+    return Response(
+        content=orjson.dumps(
+            {
+                "data": paginated_data,
+                "columns": filtered_columns,
+                "row_count": row_count,
+                "total_rows": total_rows,
+                "has_more": has_more,
+                "data_type": data_type,
+            }
+        ),
+        media_type="application/json",
+    )
 
 
 def _generate_sse_events(
     columns: List[str],
     data: List[List],
     chunk_size: int = 10,
-) -> Iterator[str]:
+) -> Iterator[bytes]:
     """Generate SSE events for streaming response."""
     # Send metadata event
-    yield f"event: metadata\ndata: {json.dumps({'columns': columns})}\n\n"
+    yield b"event: metadata\ndata: " + orjson.dumps({"columns": columns}) + b"\n\n"
 
     # Send data in chunks
     for i in range(0, len(data), chunk_size):
         chunk = data[i : i + chunk_size]
         # Convert rows to dicts
-        rows = [{col: row[idx] for idx, col in enumerate(columns)} for row in chunk]
-        yield f"event: chunk\ndata: {json.dumps({'rows': rows})}\n\n"
+        rows = [dict(zip(columns, row)) for row in chunk]
+        yield b"event: chunk\ndata: " + orjson.dumps({"rows": rows}) + b"\n\n"
 
     # Send done event
-    yield "event: done\ndata: {}\n\n"
+    yield b"event: done\ndata: {}\n\n"
 
 
 @app.get("/api/tee/datasets/decrypt-stream")
@@ -224,27 +292,25 @@ def decrypt_stream(
     all_columns = dataset["columns"]
     all_data = dataset["data"]
 
-    # Apply column filtering
-    if columns:
-        col_list = [c.strip() for c in columns.split(",")]
+    # Apply pagination first, so column filtering only touches the returned rows
+    start = offset
+    if limit is not None:
+        end = min(start + limit, len(all_data))
+    else:
+        end = len(all_data)
+    paginated_data = all_data[start:end]
+
+    # Apply column filtering (no copy when all columns are requested in order)
+    col_list = [c.strip() for c in columns.split(",")] if columns else None
+    if col_list and col_list != all_columns:
         try:
-            column_indices = [all_columns.index(col) for col in col_list]
-            filtered_data = [[row[i] for i in column_indices] for row in all_data]
+            paginated_data = _project_columns(paginated_data, MOCK_COLUMN_INDEX[dataset_id], col_list)
             filtered_columns = col_list
-        except ValueError as e:
+        except KeyError as e:
             raise HTTPException(status_code=400, detail=f"Invalid column name: {e}")
     else:
-        filtered_data = all_data
         filtered_columns = all_columns
 
-    # Apply pagination
-    start = offset
-    if limit is not None:
-        end = min(start + limit, len(filtered_data))
-    else:
-        end = len(filtered_data)
-    paginated_data = filtered_data[start:end]
-
     return StreamingResponse(
         _generate_sse_events(filtered_columns, paginated_data),
         media_type="text/event-stream",
@@ -254,3 +320,55 @@ def decrypt_stream(
         },
     )
 
+
+def _exec_gunicorn(port: int) -> None:
+    """
+    Replace this process with gunicorn managing uvicorn workers (MOCK_PROD=1).
+
+    Uses the uvicorn-worker package (uvicorn.workers.UvicornWorker is deprecated);
+    install with `pip install -e .[mock-prod]`. Worker count defaults to
+    2*ncores+1 and can be overridden with MOCK_WORKERS.
+
+    gevent (`-k gevent`) only applies to sync WSGI apps; this app is ASGI, so a
+    gevent deployment would need a WSGI port of it, and gevent's monkey-patching
+    must run before any other import.
+    """
+    workers = os.getenv("MOCK_WORKERS") or str(2 * (os.cpu_count() or 1) + 1)
+    os.execvp(
+        "gunicorn",
+        [
+            "gunicorn",
+            "-k",
+            "uvicorn_worker.UvicornWorker",
+            "-w",
+            workers,
+            "--bind",
+            f"0.0.0.0:{port}",
+            "--chdir",
+            os.path.dirname(os.path.abspath(__file__)),
+            "mock_auth_server:app",
+        ],
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.getenv("MOCK_PORT", "3003"))
+    if os.getenv("MOCK_PROD"):
+        _exec_gunicorn(port)
+
+    # For load tests, MOCK_WORKERS=2*ncores+1 is a reasonable starting point.
+    # MOCK_DATASETS is read-only, so workers need no shared state.
+    workers = int(os.getenv("MOCK_WORKERS", "1"))
+    print(f"Starting Mock Delong Datasets API on port {port} ({workers} worker(s))")
+    # Multiple workers require the app as an import string (each worker imports it again)
+    uvicorn.run(
+        "mock_auth_server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+    )
@@ -20,6 +20,18 @@ check_port() {
     fi
 }
 
+# Wait until a port is listening (multi-worker startup can take a few seconds)
+wait_for_port() {
+    local port=$1
+    for _ in $(seq 1 20); do
+        if check_port "$port"; then
+            return 0
+        fi
+        sleep 0.5
+    done
+    return 1
+}
+
 # Kill existing services
 cleanup() {
     echo "Cleaning up existing services..."
@@ -35,11 +47,14 @@ start_backend() {
     uvicorn scripts.mock_auth_server:app \
         --host 127.0.0.1 \
         --port 3003 \
+        --workers "${MOCK_WORKERS:-1}" \
+        --loop uvloop \
+        --http httptools \
+        --no-access-log \
         --log-level warning \
         > /tmp/mock_backend.log 2>&1 &
 
-    sleep 2
-    if check_port 3003; then
+    if wait_for_port 3003; then
         echo "✓ Dataset Backend running on http://localhost:3003"
         echo "  API Docs: http://localhost:3003/docs"
     else
@@ -55,8 +70,7 @@ start_attestation() {
     python scripts/mock_attestation_service.py \
         > /tmp/mock_attestation.log 2>&1 &
 
-    sleep 2
-    if check_port 8001; then
+    if wait_for_port 8001; then
         echo "✓ Attestation Service running on http://localhost:8001"
         echo "  Endpoint: http://localhost:8001/attestation/is_confidential"
     else
@@ -7,6 +7,7 @@ from typing import List, Optional
 
 from . import config
 from .downloader import load_dataset_from_api
+from .policy import enforce_export_policy, enforce_export_policy_streaming
 
 
 class DownloadOptions:
@@ -15,8 +16,8 @@ class DownloadOptions:
     def __init__(
         self,
         stream: bool = False,
-        timeout_sec: int = config.DS_TIMEOUT,
-        max_retries: int = config.DS_MAX_RETRIES,
+        timeout_sec: Optional[int] = None,
+        max_retries: Optional[int] = None,
         columns: Optional[List[str]] = None,
         limit: Optional[int] = None,
         offset: int = 0,
@@ -27,16 +28,16 @@ class DownloadOptions:
 
         Args:
             stream: If True, return IterableDataset (lazy loading); if False, fetch all data
-            timeout_sec: Request timeout in seconds
-            max_retries: Maximum number of retries for failed requests
+            timeout_sec: Request timeout in seconds (default: DS_TIMEOUT)
+            max_retries: Maximum number of retries for failed requests (default: DS_MAX_RETRIES)
             columns: Optional list of column names to fetch
             limit: Optional maximum number of rows to fetch
             offset: Starting row offset for pagination (default 0)
             query: Optional SQL query string (enables server-side DuckDB execution)
         """
         self.stream = stream
-        self.timeout_sec = timeout_sec
-        self.max_retries = max_retries
+        self.timeout_sec = config.DS_TIMEOUT if timeout_sec is None else timeout_sec
+        self.max_retries = config.DS_MAX_RETRIES if max_retries is None else max_retries
         self.columns = columns
         self.limit = limit
         self.offset = offset
@@ -83,9 +84,53 @@ def download_dataset(dataset_id: str, token: str, options: Optional[DownloadOpti
         limit=opts.limit,
         offset=opts.offset,
         query=opts.query,
+        timeout=opts.timeout_sec,
+        max_retries=opts.max_retries,
     )
 
 
+def _write_arrow(data, fmt: str, path: str) -> bool:
+    """
+    Write data as CSV or Parquet using pyarrow.
+
+    Accepts a datasets.Dataset (selections and filters are respected), a pyarrow
+    Table or a pandas DataFrame.
+
+    Returns:
+        True if written; False if pyarrow is unavailable or cannot handle the data
+        (e.g. nested columns in CSV), so the caller should fall back
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as papq
+    except ImportError:
+        return False
+
+    try:
+        if isinstance(data, pa.Table):
+            table = data
+        elif hasattr(data, "with_format") and hasattr(data, "num_rows"):
+            # Honours any indices mapping from select()/filter(); zero-copy otherwise
+            table = data.with_format("arrow")[:]  # type: ignore[attr-defined]
+        elif type(data).__name__ == "DataFrame":
+            table = pa.Table.from_pandas(data, preserve_index=False)
+        else:
+            return False
+
+        if fmt == "csv":
+            # Unquoted like the native/pandas writers; Arrow's "needed" style would
+            # still quote every string and header. Values containing a delimiter,
+            # quote or newline raise ArrowInvalid, and the caller's writer quotes them
+            options = pacsv.WriteOptions(quoting_style="none", quoting_header="none")
+            pacsv.write_csv(table, path, write_options=options)
+        else:
+            papq.write_table(table, path)
+        return True
+    except (pa.ArrowException, TypeError, ValueError):
+        return False
+
+
 def export_data(data, *, format: str, path: str) -> None:
     """
     Export dataset to file.
@@ -104,14 +149,24 @@ def export_data(data, *, format: str, path: str) -> None:
     Example:
         >>> export_data(dataset, format="csv", path="/tmp/output.csv")
     """
-    # Import policy enforcement here to avoid circular dependency
-    from .policy import enforce_export_policy
-
     # Check export limits
     rows = getattr(data, "num_rows", None)
+    if rows is None and hasattr(data, "__len__"):
+        rows = len(data)
     enforce_export_policy(rows=rows)
+    if rows is None:
+        # Lazy source (e.g. IterableDataset, which has its own to_csv/to_json):
+        # the row count is unknown up front, so materialize it under the limit
+        # before any exporter runs; an oversized source stops early
+        data = list(enforce_export_policy_streaming(data))
 
     fmt = format.lower()
+
+    # CSV/Parquet: write straight from the Arrow table with pyarrow's C++ writers,
+    # skipping the Arrow -> pandas conversion
+    if fmt in ("csv", "parquet") and _write_arrow(data, fmt, path):
+        return
+
     try:
         # Use datasets native exporters if available
         if hasattr(data, "to_csv") and fmt == "csv":
@@ -133,8 +188,10 @@ def export_data(data, *, format: str, path: str) -> None:
         if hasattr(data, "to_pandas"):
             df = data.to_pandas()  # type: ignore[attr-defined]
         else:
-            # best-effort conversion
+            # best-effort conversion of rows already checked against the limit
             df = pd.DataFrame(list(data))
+        if fmt in ("csv", "parquet") and _write_arrow(df, fmt, path):
+            return
         if fmt == "csv":
             df.to_csv(path, index=False)
         elif fmt == "json":
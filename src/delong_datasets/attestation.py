@@ -10,62 +10,72 @@ Flow:
 
 Client does NOT decide if in TEE - backend decides based on cipher.
 """
-import json
+import asyncio
+import http.client
 import socket
-import urllib.request
-from typing import Optional
+import threading
+import time
+import weakref
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from . import config
+from .compat import json_dumps, json_loads
+from .connection import default_pool
 
 
-_cached_cipher: Optional[str] = None
-
-
-def _read_http_response(sock: socket.socket) -> str:
-    """Read HTTP response from socket."""
-    data = b""
-    # Read headers
-    while b"\r\n\r\n" not in data:
-        chunk = sock.recv(4096)
-        if not chunk:
-            break
-        data += chunk
-
-    header_part, _, body_rest = data.partition(b"\r\n\r\n")
-    headers_text = header_part.decode("latin1")
-    headers_lines = headers_text.split("\r\n")
-
-    # Parse Content-Length
-    content_length = None
-    for line in headers_lines:
-        if ":" in line:
-            k, v = line.split(":", 1)
-            if k.strip().lower() == "content-length":
-                try:
-                    content_length = int(v.strip())
-                except Exception:
-                    content_length = None
-                break
-
-    if content_length is not None:
-        need = content_length - len(body_rest)
-        chunks = [body_rest]
-        while need > 0:
-            chunk = sock.recv(min(4096, need))
-            if not chunk:
-                break
-            chunks.append(chunk)
-            need -= len(chunk)
-        return b"".join(chunks).decode("utf-8")
-
-    # Fallback: read until close
-    chunks = [body_rest]
-    while True:
-        chunk = sock.recv(4096)
-        if not chunk:
-            break
-        chunks.append(chunk)
-    return b"".join(chunks).decode("utf-8")
+# (cipher, expires_at) using time.monotonic() timestamps
+_cached_cipher: Optional[Tuple[str, float]] = None
+
+# Refresh this many seconds before the configured TTL runs out
+_CACHE_SAFETY_MARGIN = 60
+
+# Failed lookups are cached briefly so callers don't hammer the verifier
+_FAILURE_CACHE_TTL = 5
+
+# Single-flight guards: only one caller refreshes the cipher, the rest wait for it.
+# asyncio locks are bound to a loop, so keep one per running loop.
+_cache_lock = threading.Lock()
+_async_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _fresh_cached_cipher() -> Optional[str]:
+    """Return the cached cipher if it has not expired, else None."""
+    cached = _cached_cipher
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
+
+def invalidate_attestation_cache() -> None:
+    """
+    Drop the cached cipher so the next get_attestation_cipher() call re-attests.
+
+    Call this when the backend rejects the current cipher (e.g. a 401/403 on a
+    request that carried it) instead of waiting for the TTL to run out.
+    """
+    global _cached_cipher
+    with _cache_lock:
+        _cached_cipher = None
+
+
+@lru_cache(maxsize=8)
+def _audience_body(audience: str) -> bytes:
+    """Request body for the local attestor; constant for a given audience."""
+    return json_dumps({"audience": audience})
+
+
+class UDSConnection(http.client.HTTPConnection):
+    """HTTPConnection that talks to a server listening on a UNIX domain socket."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
 
 
 def fetch_local_attestation_token() -> Optional[str]:
@@ -76,30 +86,19 @@ def fetch_local_attestation_token() -> Optional[str]:
         Attestation token string, or None if socket not available
     """
     try:
+        settings = config.get_settings()
+
         # Connect to local attestor service
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.settimeout(config.DS_ATTESTATION_TIMEOUT)
-        sock.connect(config.DS_ATTESTATION_SOCKET)
-
-        # Build HTTP request
-        request_body = json.dumps({"audience": config.DS_ATTESTATION_AUDIENCE})
-        http_request = (
-            f"POST /token HTTP/1.1\r\n"
-            f"Host: localhost\r\n"
-            f"Content-Type: application/json\r\n"
-            f"Content-Length:{len(request_body)}\r\n\r\n"
-            f"{request_body}"
-        )
-
-        # Send request
-        sock.sendall(http_request.encode("utf-8"))
-
-        # Read response
-        response_body = _read_http_response(sock)
-        sock.close()
+        conn = UDSConnection(settings.attestation_socket, settings.attestation_timeout)
+        try:
+            request_body = _audience_body(settings.attestation_audience)
+            conn.request("POST", "/token", body=request_body, headers={"Content-Type": "application/json"})
+            response_body = conn.getresponse().read()
+        finally:
+            conn.close()
 
         # Parse JSON response
-        data = json.loads(response_body)
+        data = json_loads(response_body)
         return data.get("token")
 
     except Exception:
@@ -117,24 +116,25 @@ def request_attestation_cipher(token: str) -> Optional[str]:
     Returns:
         Encrypted cipher from remote service, or None if verification fails
     """
-    if not config.DS_ATTESTATION_ENDPOINT:
+    settings = config.get_settings()
+    if not settings.attestation_endpoint:
         return None
 
     # Build request to remote verification service
-    payload = json.dumps({"token": token}).encode("utf-8")
-    req = urllib.request.Request(
-        config.DS_ATTESTATION_ENDPOINT,
-        data=payload,
+    # Fixed single-key shape: only the token string needs encoding
+    payload = b'{"token":' + json_dumps(token) + b"}"
+
+    # Send request over a pooled keep-alive connection
+    with default_pool.request(
+        "POST",
+        settings.attestation_endpoint,
+        body=payload,
         headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-
-    # Send request
-    with urllib.request.urlopen(req, timeout=config.DS_ATTESTATION_TIMEOUT) as resp:  # nosec - controlled endpoint
-        if resp.getcode() != 200:
-            return None
-
+        timeout=settings.attestation_timeout,
+    ) as resp:
         raw = resp.read().decode("utf-8")
+        if resp.status != 200:
+            return None
         if isinstance(raw, str):
             return raw
         else:
@@ -151,26 +151,72 @@ def get_attestation_cipher() -> str:
     3. Returns encrypted cipher from remote service
     4. Returns empty string if not in TEE or verification fails
 
+    Successful ciphers are cached for DS_ATTESTATION_CACHE_TTL seconds (minus a
+    safety margin); failures are cached for a few seconds only, so a transient
+    verifier outage does not pin the client to sample data.
+
     Returns:
         Encrypted cipher string (to use as runtime_key), or empty string
     """
     global _cached_cipher
 
-    # Return cached value if available
-    if _cached_cipher is not None:
-        return _cached_cipher
+    # Fast path: no locking while the cached value is fresh
+    cached = _fresh_cached_cipher()
+    if cached is not None:
+        return cached
+
+    with _cache_lock:
+        # Another thread may have refreshed the cache while we waited for the lock
+        cached = _fresh_cached_cipher()
+        if cached is not None:
+            return cached
+
+        now = time.monotonic()
+
+        # Try to fetch local attestation token
+        local_token = fetch_local_attestation_token() or ""
+        # if not local_token:
+        #     # Not in TEE environment or socket not available
+        #     _cached_cipher = ""
+        #     return _cached_cipher
+
+        # Request cipher from remote verification service
+        try:
+            cipher = request_attestation_cipher(local_token) or ""
+        except (OSError, http.client.HTTPException):
+            # Verifier unreachable or timed out: cache it as a failure too, so
+            # callers don't each wait out DS_ATTESTATION_TIMEOUT
+            cipher = ""
+        if cipher:
+            ttl = max(config.get_settings().attestation_cache_ttl - _CACHE_SAFETY_MARGIN, 0)
+        else:
+            ttl = _FAILURE_CACHE_TTL
+        _cached_cipher = (cipher, now + ttl)
 
-    # Try to fetch local attestation token
-    local_token = fetch_local_attestation_token() or ""
-    # if not local_token:
-    #     # Not in TEE environment or socket not available
-    #     _cached_cipher = ""
-    #     return _cached_cipher
+        return cipher
 
-    # Request cipher from remote verification service
-    cipher = request_attestation_cipher(local_token)
-    _cached_cipher = cipher or ""
 
-    return _cached_cipher
+async def aget_attestation_cipher() -> str:
+    """
+    Async variant of get_attestation_cipher().
 
+    Concurrent coroutines on the same event loop share a single refresh; the
+    blocking socket/HTTP work runs in the loop's default executor.
 
+    Returns:
+        Encrypted cipher string (to use as runtime_key), or empty string
+    """
+    cached = _fresh_cached_cipher()
+    if cached is not None:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    lock = _async_locks.get(loop)
+    if lock is None:
+        lock = _async_locks[loop] = asyncio.Lock()
+
+    async with lock:
+        cached = _fresh_cached_cipher()
+        if cached is not None:
+            return cached
+        return await loop.run_in_executor(None, get_attestation_cipher)
@@ -0,0 +1,77 @@
+"""
+Local on-disk cache of decrypt-stream responses.
+
+Controlled by DS_CACHE_MODE:
+- "disabled" (default): no cache
+- "enabled": serve hits from disk, fetch and store misses
+- "replay": serve hits from disk, raise CacheMissError on a miss (no network)
+- "write-only": always fetch, store the result (refreshes the cache)
+
+Entries live under DS_CACHE_DIR, one JSON file per request, keyed by a SHA256
+of the request URL and a hash of the bearer token. Cached rows are decrypted
+data written to local disk: only enable this for development and sample data.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from . import config
+from .compat import json_dumps, json_loads
+
+
+MODES = ("disabled", "enabled", "replay", "write-only")
+
+
+def cache_key(url: str, token: str) -> str:
+    """
+    Build the cache key for a request.
+
+    Args:
+        url: Full request URL, including the query string
+        token: Bearer token (only its hash goes into the key)
+
+    Returns:
+        Hex SHA256 digest
+    """
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return hashlib.sha256(json_dumps([url, token_hash])).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(config.DS_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def get(key: str) -> Optional[List[Dict[str, Any]]]:
+    """Return the cached rows for key, or None on a miss (or an unreadable entry)."""
+    try:
+        with open(_entry_path(key), "rb") as f:
+            return json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def put(key: str, rows: List[Dict[str, Any]]) -> None:
+    """Store rows under key. The file is written atomically and readable by the owner only."""
+    path = _entry_path(key)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # stdlib json, not json_dumps: orjson would turn NaN/Infinity in rows into null
+            f.write(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def clear() -> None:
+    """Delete all cache entries."""
+    shutil.rmtree(config.DS_CACHE_DIR, ignore_errors=True)
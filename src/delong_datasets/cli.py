@@ -2,6 +2,7 @@
 import argparse
 import sys
 
+from . import config
 from .api import DownloadOptions, download_dataset, export_data
 
 
@@ -55,7 +56,12 @@ def main(argv=None) -> int:
 
         if args.cmd == "export":
             columns = args.columns.split(",") if args.columns else None
-            opts = DownloadOptions(stream=False, columns=columns, limit=args.limit)
+            # Never fetch more than one row past the export limit: that is enough
+            # for export_data to reject an oversized export
+            limit = config.MAX_LOCAL_EXPORT_ROWS + 1
+            if args.limit is not None:
+                limit = min(args.limit, limit)
+            opts = DownloadOptions(stream=False, columns=columns, limit=limit)
             data = download_dataset(args.dataset_id, args.token, opts)
             export_data(data, format=args.format, path=args.output)
             rows = getattr(data, "num_rows", "unknown")
@@ -0,0 +1,62 @@
+"""
+Optional accelerators with stdlib fallbacks.
+
+orjson is used for JSON when installed (pip install delong-datasets[fast]);
+otherwise the stdlib json module is used. Both paths accept str or bytes
+input and produce compact UTF-8 bytes. Where orjson would parse differently
+from the stdlib -- NaN/Infinity, integers beyond 64 bits -- json_loads uses
+the stdlib, so installing orjson never changes parsed data. json_dumps is for
+payloads the client builds: orjson writes NaN/Infinity as null.
+
+zstandard, when installed, lets the client accept zstd-compressed responses.
+"""
+import json
+import re
+from typing import Any, Optional, Union
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None  # type: ignore[assignment]
+
+# orjson reads integers that overflow 64 bits as floats; 20+ digit runs are
+# rare, so such payloads (and any digits inside strings) just take the stdlib path
+_LONG_DIGITS = re.compile(rb"[0-9]{20}")
+_LONG_DIGITS_STR = re.compile(r"[0-9]{20}")
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse JSON from str or UTF-8 bytes, with the stdlib's semantics."""
+    if orjson is not None:
+        long_digits = _LONG_DIGITS_STR if isinstance(data, str) else _LONG_DIGITS
+        if not long_digits.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # e.g. NaN/Infinity, which json.dumps emits by default
+                pass
+    return json.loads(data)
+
+
+def zstd_decompressobj() -> Optional[Any]:
+    """Return an incremental zstd decompressor, or None if zstandard is not installed."""
+    if zstandard is None:
+        return None
+    return zstandard.ZstdDecompressor().decompressobj()
@@ -1,5 +1,15 @@
+"""
+Library settings, read from DS_* environment variables.
+
+Settings are resolved once into a frozen Settings object returned by
+get_settings(); call reload_settings() after changing the environment (e.g. in
+tests). Module attributes such as config.DS_TIMEOUT remain available and read
+from the current settings.
+"""
 import json
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 
@@ -27,27 +37,113 @@ def _get_env_json(name: str, default: Optional[Dict[str, Any]] = None) -> Option
         return default
 
 
-# External service base URL for dataset API
-DS_API_BASE_URL: Optional[str] = os.getenv("DS_API_BASE_URL", "https://dlex.avinasi.ai")
+@dataclass(frozen=True)
+class Settings:
+    """Resolved library settings (see the DS_* module attributes for descriptions)."""
+
+    api_base_url: Optional[str]
+    decrypt_stream_endpoint: str
+    timeout: int
+    max_retries: int
+    default_limit: int
+    max_limit: int
+    max_workers: int
+    dl_workers: int
+    pool_maxsize: int
+    rpm: int
+    tpm: int
+    max_local_export_rows: int
+    attestation_socket: str
+    attestation_audience: str
+    attestation_endpoint: Optional[str]
+    attestation_timeout: int
+    attestation_cache_ttl: int
+    cache_dir: str
+    cache_mode: str
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        api_base_url = os.getenv("DS_API_BASE_URL", "https://dlex.avinasi.ai")
+        return cls(
+            # External service base URL for dataset API
+            api_base_url=api_base_url,
+            # Dataset decrypt stream endpoint (backend SSE: GET /api/tee/datasets/decrypt-stream)
+            decrypt_stream_endpoint=os.getenv(
+                "DS_DECRYPT_STREAM_ENDPOINT", f"{api_base_url}/api/tee/datasets/decrypt-stream"
+            ),
+            # Timeouts and retries
+            timeout=_get_env_int("DS_TIMEOUT", 30),
+            max_retries=_get_env_int("DS_MAX_RETRIES", 3),
+            # Pagination defaults
+            default_limit=_get_env_int("DS_DEFAULT_LIMIT", 1000),
+            max_limit=_get_env_int("DS_MAX_LIMIT", 10000),
+            # Concurrent requests for paged (non-query) reads over one page, including
+            # unbounded and streaming ones, and for byte-range file downloads (1 disables)
+            max_workers=_get_env_int("DS_MAX_WORKERS", 8),
+            # Threads in the shared download executor (0 = DS_MAX_WORKERS)
+            dl_workers=_get_env_int("DS_DL_WORKERS", 0),
+            # Idle keep-alive connections kept per host (0 = max(8, DS_MAX_WORKERS))
+            pool_maxsize=_get_env_int("DS_POOL_MAXSIZE", 0),
+            # Client-side rate limits: requests and rows per minute (0 disables)
+            rpm=_get_env_int("DS_RPM", 0),
+            tpm=_get_env_int("DS_TPM", 0),
+            # Local export limits
+            max_local_export_rows=_get_env_int("DS_MAX_LOCAL_EXPORT_ROWS", 10000),
+            # Attestation settings - for fetching cipher from remote verification service
+            attestation_socket=os.getenv("DS_ATTESTATION_SOCKET", "/var/run/delong-attestor/socket"),
+            attestation_audience=os.getenv("DS_ATTESTATION_AUDIENCE", "https://delongapi.internal"),
+            attestation_endpoint=os.getenv(
+                "DS_ATTESTATION_ENDPOINT", "http://34.111.110.19/attestation/is_confidential"
+            ),
+            attestation_timeout=_get_env_int("DS_ATTESTATION_TIMEOUT", 10),
+            # Lifetime of a cached attestation cipher in seconds (refreshed 60s before expiry)
+            attestation_cache_ttl=_get_env_int("DS_ATTESTATION_CACHE_TTL", 900),
+            # Local response cache (see delong_datasets.cache): disabled, enabled, replay or write-only
+            cache_dir=os.getenv(
+                "DS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "delong_datasets")
+            ),
+            cache_mode=os.getenv("DS_CACHE_MODE", "disabled").strip().lower(),
+        )
+
 
-# Dataset decrypt stream endpoint (backend SSE: GET /api/tee/datasets/decrypt-stream)
-DS_DECRYPT_STREAM_ENDPOINT: str = os.getenv("DS_DECRYPT_STREAM_ENDPOINT", f"{DS_API_BASE_URL}/api/tee/datasets/decrypt-stream")
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the settings, reading the environment on first use."""
+    return Settings.from_env()
 
-# Timeouts and retries
-DS_TIMEOUT: int = _get_env_int("DS_TIMEOUT", 30)
-DS_MAX_RETRIES: int = _get_env_int("DS_MAX_RETRIES", 3)
 
-# Pagination defaults
-DS_DEFAULT_LIMIT: int = _get_env_int("DS_DEFAULT_LIMIT", 1000)
-DS_MAX_LIMIT: int = _get_env_int("DS_MAX_LIMIT", 10000)
+def reload_settings() -> Settings:
+    """Re-read settings from the environment."""
+    get_settings.cache_clear()
+    return get_settings()
 
-# Local export limits
-MAX_LOCAL_EXPORT_ROWS: int = _get_env_int("DS_MAX_LOCAL_EXPORT_ROWS", 10000)
 
-# Attestation settings - for fetching cipher from remote verification service
-DS_ATTESTATION_SOCKET: str = os.getenv("DS_ATTESTATION_SOCKET", "/var/run/delong-attestor/socket")
-DS_ATTESTATION_AUDIENCE: str = os.getenv("DS_ATTESTATION_AUDIENCE", "https://delongapi.internal")
-DS_ATTESTATION_ENDPOINT: Optional[str] = os.getenv("DS_ATTESTATION_ENDPOINT", "http://34.111.110.19/attestation/is_confidential")
-DS_ATTESTATION_TIMEOUT: int = _get_env_int("DS_ATTESTATION_TIMEOUT", 10)
+# Module attribute -> Settings field, for config.DS_* style access
+_ATTRIBUTES: Dict[str, str] = {
+    "DS_API_BASE_URL": "api_base_url",
+    "DS_DECRYPT_STREAM_ENDPOINT": "decrypt_stream_endpoint",
+    "DS_TIMEOUT": "timeout",
+    "DS_MAX_RETRIES": "max_retries",
+    "DS_DEFAULT_LIMIT": "default_limit",
+    "DS_MAX_LIMIT": "max_limit",
+    "DS_MAX_WORKERS": "max_workers",
+    "DS_DL_WORKERS": "dl_workers",
+    "DS_POOL_MAXSIZE": "pool_maxsize",
+    "DS_RPM": "rpm",
+    "DS_TPM": "tpm",
+    "MAX_LOCAL_EXPORT_ROWS": "max_local_export_rows",
+    "DS_ATTESTATION_SOCKET": "attestation_socket",
+    "DS_ATTESTATION_AUDIENCE": "attestation_audience",
+    "DS_ATTESTATION_ENDPOINT": "attestation_endpoint",
+    "DS_ATTESTATION_TIMEOUT": "attestation_timeout",
+    "DS_ATTESTATION_CACHE_TTL": "attestation_cache_ttl",
+    "DS_CACHE_DIR": "cache_dir",
+    "DS_CACHE_MODE": "cache_mode",
+}
 
 
+def __getattr__(name: str) -> Any:
+    field = _ATTRIBUTES.get(name)
+    if field is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_settings(), field)
@@ -0,0 +1,392 @@
+"""
+Keep-alive HTTP connection pooling.
+
+A small stdlib-only pool built on http.client. Requests to the same
+(scheme, host, port) reuse idle connections, so repeated calls skip the
+TCP and TLS handshakes that urllib.request.urlopen pays on every request.
+
+Proxies from the standard *_proxy environment variables are honoured
+(HTTPS is tunnelled with CONNECT). Idempotent requests can be retried with
+exponential backoff on connection errors and 429/5xx responses, and
+compressed (gzip/deflate, zstd when available) bodies can be decoded on the fly.
+"""
+import base64
+import http.client
+import ssl
+import threading
+import time
+import urllib.request
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from . import config
+from .compat import zstandard, zstd_decompressobj
+
+
+_PoolKey = Tuple[str, str, int]
+
+# Only methods that are safe to send twice are retried
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_BACKOFF = 30.0
+
+# Sent when decode_content=True and the caller did not set Accept-Encoding
+ACCEPT_ENCODING = "gzip, deflate, zstd" if zstandard is not None else "gzip, deflate"
+_DECODE_READ_SIZE = 64 * 1024
+
+
+class PooledResponse:
+    """
+    Response wrapper that hands its connection back to the pool on close.
+
+    The connection is only reused when the body was read to the end and the
+    server did not ask to close it; otherwise it is discarded.
+    """
+
+    def __init__(
+        self,
+        pool: "ConnectionPool",
+        key: _PoolKey,
+        conn: http.client.HTTPConnection,
+        resp: http.client.HTTPResponse,
+        decode_content: bool = False,
+    ) -> None:
+        self._pool = pool
+        self._key = key
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._resp = resp
+        self._decoder = _decoder_for(resp.headers.get("Content-Encoding")) if decode_content else None
+        self._decoded = bytearray()
+        self._decoded_eof = False
+
+    @property
+    def status(self) -> int:
+        return self._resp.status
+
+    @property
+    def reason(self) -> str:
+        return self._resp.reason
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._resp.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if self._decoder is None:
+            return self._resp.read(amt)
+        while not self._decoded_eof and (amt is None or len(self._decoded) < amt):
+            self._fill()
+        return self._take(len(self._decoded) if amt is None else amt)
+
+    def readinto(self, b: memoryview) -> int:
+        """Read up to len(b) bytes into b; returns the count (0 at end of body)."""
+        if self._decoder is None:
+            return self._resp.readinto(b)
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def readline(self, limit: int = -1) -> bytes:
+        if self._decoder is None:
+            return self._resp.readline(limit)
+        scanned = 0
+        while True:
+            end = self._decoded.find(b"\n", scanned)
+            if end >= 0:
+                size = end + 1
+                break
+            if self._decoded_eof or 0 <= limit <= len(self._decoded):
+                size = len(self._decoded)
+                break
+            scanned = len(self._decoded)
+            self._fill()
+        return self._take(size if limit < 0 else min(size, limit))
+
+    def _fill(self) -> None:
+        """Decompress the next block of the body into the decoded buffer."""
+        raw = self._resp.read1(_DECODE_READ_SIZE)
+        if raw:
+            self._decoded += self._decoder.decompress(raw)
+        else:
+            self._decoded += self._decoder.flush()
+            self._decoded_eof = True
+
+    def _take(self, size: int) -> bytes:
+        out = bytes(self._decoded[:size])
+        del self._decoded[:size]
+        return out
+
+    def drain(self, max_bytes: int = 64 * 1024, timeout: float = 1.0) -> None:
+        """
+        Read what is left of the body so the connection can be reused.
+
+        Gives up (and the connection is discarded on close) if more than
+        max_bytes remain or the server stalls for longer than timeout.
+        """
+        conn = self._conn
+        if conn is None or self._resp.isclosed() or self._resp.length == 0:
+            return
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            remaining = max_bytes
+            while remaining > 0:
+                chunk = self._resp.read1(remaining)
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+        except (OSError, http.client.HTTPException):
+            pass
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        resp = self._resp
+        if not resp.isclosed() and resp.length == 0:
+            # readline()/read1() stop at the end of a Content-Length body without
+            # closing the response; read() finishes it so the connection is reusable
+            try:
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                pass
+        if resp.isclosed() and not resp.will_close:
+            self._pool._put(self._key, conn)
+        else:
+            self._resp.close()
+            conn.close()
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of idle keep-alive connections keyed by (scheme, host, port)."""
+
+    def __init__(self, maxsize: Optional[int] = 8) -> None:
+        """
+        Args:
+            maxsize: Maximum number of idle connections kept per host; None follows
+                DS_POOL_MAXSIZE (by default sized to DS_MAX_WORKERS, at least 8)
+        """
+        self.maxsize = maxsize
+        self._idle: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _new_connection(self, key: _PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = _proxy_for(scheme, host)
+
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            if proxy is None:
+                return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+            proxy_host, proxy_port, proxy_headers = proxy
+            conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=timeout, context=self._ssl_context)
+            conn.set_tunnel(host, port, headers=proxy_headers)
+            return conn
+
+        if proxy is None:
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        proxy_host, proxy_port, _proxy_headers = proxy
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=timeout)
+
+    def _max_idle(self) -> int:
+        if self.maxsize is not None:
+            return self.maxsize
+        return config.DS_POOL_MAXSIZE or max(8, config.DS_MAX_WORKERS)
+
+    def _get(self, key: _PoolKey, timeout: float) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _put(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle():
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float,
+        retries: int = 0,
+        backoff_factor: float = 0.2,
+        decode_content: bool = False,
+    ) -> PooledResponse:
+        """
+        Send a request, reusing an idle connection to the same host when possible.
+
+        Non-2xx statuses are returned, not raised; callers check resp.status.
+        Close the response (or use it as a context manager) to release the connection.
+
+        Idempotent methods are retried up to `retries` times on connection errors
+        and on 429/5xx responses, sleeping backoff_factor * 2**attempt seconds
+        between attempts (or the server's Retry-After, when given). The last
+        response is returned as-is once retries are exhausted.
+
+        With decode_content, compressed bodies are requested (ACCEPT_ENCODING)
+        and read()/readline() return decompressed bytes. Leave it off for Range
+        requests: byte offsets refer to the encoded body.
+
+        Args:
+            method: HTTP method
+            url: Absolute http(s) URL
+            body: Optional request body
+            headers: Optional request headers
+            timeout: Socket timeout in seconds
+            retries: Maximum number of retries for idempotent methods (default 0)
+            backoff_factor: Base delay in seconds for exponential backoff
+            decode_content: Request and transparently decode compressed bodies
+
+        Returns:
+            PooledResponse
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = dict(headers or {})
+        if decode_content and not any(k.lower() == "accept-encoding" for k in headers):
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        if scheme == "http":
+            proxy = _proxy_for(scheme, parts.hostname)
+            if proxy is not None:
+                # Plain-HTTP proxies expect the absolute URL as the request target
+                path = url
+                headers.update(proxy[2])
+
+        if method.upper() not in _IDEMPOTENT_METHODS:
+            retries = 0
+
+        attempt = 0
+        while True:
+            try:
+                resp = self._send(key, method, path, body, headers, timeout, decode_content)
+            except (OSError, http.client.HTTPException):
+                if attempt >= retries:
+                    raise
+                delay = _backoff(backoff_factor, attempt)
+            else:
+                if resp.status not in _RETRY_STATUSES or attempt >= retries:
+                    return resp
+                delay = retry_after_seconds(resp.headers.get("Retry-After"))
+                if delay is None:
+                    delay = _backoff(backoff_factor, attempt)
+                # Error bodies are small; draining keeps the connection reusable
+                resp.drain()
+                resp.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def _send(
+        self,
+        key: _PoolKey,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        timeout: float,
+        decode_content: bool,
+    ) -> PooledResponse:
+        conn = self._get(key, timeout)
+        if conn is not None:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return PooledResponse(self, key, conn, conn.getresponse(), decode_content)
+            except ConnectionError:
+                # The server closed the idle keep-alive connection; retry on a fresh one
+                conn.close()
+            except BaseException:
+                conn.close()
+                raise
+
+        conn = self._new_connection(key, timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return PooledResponse(self, key, conn, conn.getresponse(), decode_content)
+        except BaseException:
+            conn.close()
+            raise
+
+    def clear(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+def _decoder_for(content_encoding: Optional[str]) -> Optional[Any]:
+    """Return an incremental decompressor for a Content-Encoding, or None for identity."""
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    if encoding == "zstd":
+        decoder = zstd_decompressobj()
+        if decoder is not None:
+            return decoder
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+def _backoff(backoff_factor: float, attempt: int) -> float:
+    return min(backoff_factor * (2 ** attempt), _MAX_BACKOFF)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a delta-seconds Retry-After header; HTTP-date values are ignored."""
+    if not value:
+        return None
+    try:
+        return min(max(float(value), 0.0), _MAX_BACKOFF)
+    except ValueError:
+        return None
+
+
+def _proxy_for(scheme: str, host: str) -> Optional[Tuple[str, int, Dict[str, str]]]:
+    """Return (proxy_host, proxy_port, proxy_headers) from the environment, if any applies."""
+    proxy_url = urllib.request.getproxies().get(scheme)
+    if not proxy_url or urllib.request.proxy_bypass(host):
+        return None
+    parts = urlsplit(proxy_url if "://" in proxy_url else f"http://{proxy_url}")
+    if not parts.hostname:
+        return None
+    headers: Dict[str, str] = {}
+    if parts.username:
+        creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    return parts.hostname, parts.port or 80, headers
+
+
+# Process-wide pool shared by the attestation and dataset clients. Its size
+# follows the configured concurrency, so parallel page and range requests all
+# find a warm connection instead of discarding the surplus after each round.
+default_pool = ConnectionPool(maxsize=None)
@@ -3,9 +3,14 @@ Dataset conversion utilities.
 
 Converts backend API 2D array response format to datasets.Dataset objects.
 """
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import Future
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
+from . import config
 from .metadata import decrypt_stream_iter
+from .workers import get_executor
 
 
 def response_to_dict_list(response: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -20,7 +25,131 @@ def response_to_dict_list(response: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     columns = response["columns"]
     data = response["data"]
-    return [{col: row[i] for i, col in enumerate(columns)} for row in data]
+    return [dict(zip(columns, row)) for row in data]
+
+
+def fetch_rows_parallel(
+    dataset_id: str,
+    token: str,
+    *,
+    columns: Optional[List[str]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[int] = None,
+    max_retries: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch rows from offset as concurrent fixed-size pages, yielded in order.
+
+    Pages are prefetched through a sliding window: it starts at one request in
+    flight and doubles after every full page, up to max_workers. Small datasets
+    therefore cost a single request, while large ones quickly reach full
+    concurrency. Fetching stops after the first short page (end of dataset) or
+    once limit rows have been yielded.
+
+    Args:
+        dataset_id: Dataset identifier
+        token: JWT bearer token
+        columns: Optional list of columns to fetch
+        offset: Starting row offset
+        limit: Number of rows to fetch (default: until the end of the dataset)
+        page_size: Rows per request (default: DS_DEFAULT_LIMIT)
+        max_workers: Maximum concurrent requests (default: DS_MAX_WORKERS)
+        timeout: Per-request timeout in seconds (default: DS_TIMEOUT)
+        max_retries: Retries per page request (default: DS_MAX_RETRIES)
+
+    Yields:
+        Dict[str, Any] for each row
+    """
+    if page_size is None:
+        page_size = config.DS_DEFAULT_LIMIT
+    if max_workers is None:
+        max_workers = config.DS_MAX_WORKERS
+    end = None if limit is None else offset + limit
+
+    def pages() -> Iterator[Tuple[int, int]]:
+        start = offset
+        while end is None or start < end:
+            size = page_size if end is None else min(page_size, end - start)
+            yield start, size
+            start += size
+
+    def fetch(start: int, size: int) -> List[Dict[str, Any]]:
+        return list(
+            decrypt_stream_iter(
+                dataset_id,
+                token,
+                columns=columns,
+                offset=start,
+                limit=size,
+                timeout=timeout,
+                max_retries=max_retries,
+            )
+        )
+
+    max_workers = max(1, max_workers)
+    executor = get_executor()
+    pending: Deque[Tuple[int, Future]] = deque()
+    window = 1
+    try:
+        remaining = pages()
+        for start, size in islice(remaining, window):
+            pending.append((size, executor.submit(fetch, start, size)))
+        while pending:
+            size, future = pending.popleft()
+            rows = future.result()
+            yield from rows
+            if len(rows) < size:
+                return
+            window = min(window * 2, max_workers)
+            for start, next_size in islice(remaining, window - len(pending)):
+                pending.append((next_size, executor.submit(fetch, start, next_size)))
+    finally:
+        # The executor is shared; drop only this call's queued pages
+        for _size, future in pending:
+            future.cancel()
+
+
+def _iter_rows(
+    dataset_id: str,
+    token: str,
+    *,
+    columns: Optional[List[str]],
+    offset: int,
+    limit: Optional[int],
+    query: Optional[str],
+    timeout: Optional[int] = None,
+    max_retries: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield rows, splitting plain reads into prefetched parallel page requests."""
+    page_size = config.DS_DEFAULT_LIMIT
+    # Query results have no stable row order to page over, so they keep the
+    # single sequential stream; so do reads that fit in one page
+    if query is None and (limit is None or limit > page_size) and config.DS_MAX_WORKERS > 1:
+        yield from fetch_rows_parallel(
+            dataset_id,
+            token,
+            columns=columns,
+            offset=offset,
+            limit=limit,
+            page_size=page_size,
+            max_workers=config.DS_MAX_WORKERS,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+        return
+    yield from decrypt_stream_iter(
+        dataset_id,
+        token,
+        columns=columns,
+        offset=offset,
+        limit=limit,
+        query=query,
+        timeout=timeout,
+        max_retries=max_retries,
+    )
 
 
 def load_dataset_from_api(
@@ -32,6 +161,8 @@ def load_dataset_from_api(
     limit: Optional[int] = None,
     offset: int = 0,
     query: Optional[str] = None,
+    timeout: Optional[int] = None,
+    max_retries: Optional[int] = None,
 ):
     """
     Load dataset via SSE stream and return as datasets.Dataset or IterableDataset.
@@ -44,6 +175,8 @@ def load_dataset_from_api(
         limit: Optional maximum number of rows to fetch (default: fetch all)
         offset: Starting row offset for pagination (default: 0)
         query: Optional SQL query string; when provided, columns filter is ignored by server
+        timeout: Per-request timeout in seconds (default: DS_TIMEOUT)
+        max_retries: Retries per request on connection errors and 429/5xx (default: DS_MAX_RETRIES)
 
     Returns:
         datasets.Dataset or datasets.IterableDataset
@@ -52,38 +185,57 @@ def load_dataset_from_api(
 
     if streaming:
         def gen():
-            for row in decrypt_stream_iter(
+            for row in _iter_rows(
                 dataset_id,
                 token,
                 columns=columns,
                 offset=offset,
                 limit=limit,
                 query=query,
+                timeout=timeout,
+                max_retries=max_retries,
             ):
                 yield row
 
         return IterableDataset.from_generator(gen)
 
-    # Non-streaming: collect all into memory
-    rows: List[Dict[str, Any]] = []
-    for row in decrypt_stream_iter(
+    # Non-streaming: build the Arrow table column-wise, one batch of rows at a
+    # time, instead of a list of row dicts that Dataset.from_list re-converts.
+    # Each batch becomes Arrow string arrays right away, so Python str objects
+    # only ever exist for one batch.
+    import pyarrow as pa
+
+    rows = _iter_rows(
         dataset_id,
         token,
         columns=columns,
         offset=offset,
         limit=limit,
         query=query,
-    ):
-        rows.append(row)
-
-    # Convert all values to strings to avoid Arrow type inference issues
-    # (e.g., source_version can be 14.0 or "1.0.0")
-    if rows:
-        for row in rows:
-            for key in row:
-                if row[key] is not None:
-                    row[key] = str(row[key])
-
-    return Dataset.from_list(rows)
-
-
+        timeout=timeout,
+        max_retries=max_retries,
+    )
+    batch_size = max(1, config.DS_DEFAULT_LIMIT)
+    names: Optional[List[str]] = None
+    chunks: List[List[pa.Array]] = []
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        if names is None:
+            # Schema follows the first row, as with Dataset.from_list
+            names = list(batch[0])
+            chunks = [[] for _ in names]
+        for name, column_chunks in zip(names, chunks):
+            # Convert all values to strings to avoid Arrow type inference issues
+            # (e.g., source_version can be 14.0 or "1.0.0")
+            values = [row.get(name) for row in batch]
+            column_chunks.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+
+    if names is None:
+        return Dataset.from_list([])
+
+    table = pa.table(
+        {name: pa.chunked_array(column_chunks, type=pa.string()) for name, column_chunks in zip(names, chunks)}
+    )
+    return Dataset(table)
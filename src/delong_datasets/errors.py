@@ -1,3 +1,6 @@
+from typing import Dict, Optional, Type
+
+
 class AuthError(Exception):
     pass
 
@@ -7,7 +10,10 @@ class NotFoundError(Exception):
 
 
 class RateLimitError(Exception):
-    pass
+    def __init__(self, message: str = "", retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        # Seconds to wait before retrying, from the server's Retry-After header
+        self.retry_after = retry_after
 
 
 class RemoteServerError(Exception):
@@ -26,3 +32,40 @@ class PolicyViolationError(Exception):
     pass
 
 
+class IntegrityError(Exception):
+    pass
+
+
+class CacheMissError(Exception):
+    pass
+
+
+# HTTP status -> exception raised for it; other 5xx map to RemoteServerError
+_STATUS_EXC: Dict[int, Type[Exception]] = {
+    401: AuthError,
+    403: AuthError,
+    404: NotFoundError,
+    429: RateLimitError,
+}
+
+
+def raise_for_status(status: int, message: str, retry_after: Optional[float] = None) -> None:
+    """
+    Raise the library exception for a non-2xx HTTP status.
+
+    Args:
+        status: HTTP status code
+        message: Error message (usually the response body)
+        retry_after: Retry-After delay in seconds, attached to RateLimitError
+
+    Raises:
+        AuthError, NotFoundError, RateLimitError, RemoteServerError or NetworkError
+    """
+    exc = _STATUS_EXC.get(status)
+    if exc is RateLimitError:
+        raise RateLimitError(message, retry_after=retry_after)
+    if exc is not None:
+        raise exc(message)
+    if 500 <= status < 600:
+        raise RemoteServerError(message)
+    raise NetworkError(message)
@@ -3,12 +3,40 @@ Dataset decryption streaming client (SSE).
 
 Connects to GET /datasets/decrypt-stream and yields rows progressively.
 """
-import json
-import urllib.request
-from typing import Any, Dict, Iterator, List, Optional
-
-from . import config
-from .errors import AuthError, NetworkError, NotFoundError, ParseError, RateLimitError, RemoteServerError
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from . import cache, config
+from .compat import json_loads
+from .connection import ConnectionPool, default_pool, retry_after_seconds
+from .errors import (
+    AuthError,
+    CacheMissError,
+    NetworkError,
+    NotFoundError,
+    ParseError,
+    RateLimitError,
+    RemoteServerError,
+    raise_for_status,
+)
+from .ratelimit import get_bucket
+
+
+@lru_cache(maxsize=64)
+def _url_prefix(endpoint: str, dataset_id: str, columns: Tuple[str, ...], query: Optional[str]) -> str:
+    """Return the decrypt-stream URL up to (not including) the offset/limit parameters."""
+    params: Dict[str, Any] = {
+        "dataset_id": dataset_id,
+        "metadata_uri": dataset_id,  # Use dataset_id as metadata_uri (required by backend)
+    }
+    if query:
+        params["query"] = query
+    else:
+        if columns:
+            params["columns"] = ",".join(columns)
+    return f"{endpoint}?{urlencode(params)}"
 
 
 def decrypt_stream_iter(
@@ -19,7 +47,9 @@ def decrypt_stream_iter(
     offset: int = 0,
     limit: Optional[int] = None,
     query: Optional[str] = None,
-    timeout: int = config.DS_TIMEOUT,
+    timeout: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    pool: Optional[ConnectionPool] = None,
 ) -> Iterator[Dict[str, Any]]:
     """
     Connect to SSE decrypt stream and yield rows as dicts.
@@ -31,55 +61,112 @@ def decrypt_stream_iter(
         offset: Starting row offset (default 0)
         limit: Optional maximum number of rows to yield
         query: Optional SQL query string (server executes on DuckDB)
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds (default: DS_TIMEOUT)
+        max_retries: Retries on connection errors and 429/5xx before the stream starts
+            (default: DS_MAX_RETRIES)
+        pool: Connection pool to send the request through (default: shared keep-alive pool)
 
     Yields:
         Dict[str, Any] for each row with keys per metadata.columns
+
+    Raises:
+        CacheMissError: DS_CACHE_MODE is "replay" and the request is not cached
     """
     if not config.DS_DECRYPT_STREAM_ENDPOINT:
         raise NotFoundError("DS_DECRYPT_STREAM_ENDPOINT is not configured")
-
-    # Build URL with query parameters
-    from urllib.parse import urlencode
-
-    params: Dict[str, Any] = {
-        "dataset_id": dataset_id,
-        "metadata_uri": dataset_id,  # Use dataset_id as metadata_uri (required by backend)
-    }
-    if query:
-        params["query"] = query
-    else:
-        if columns:
-            params["columns"] = ",".join(columns)
+    if timeout is None:
+        timeout = config.DS_TIMEOUT
+    if max_retries is None:
+        max_retries = config.DS_MAX_RETRIES
+
+    # Only offset/limit vary between the pages of one download; the rest of the
+    # query string is encoded once per (endpoint, dataset, columns, query)
+    url = _url_prefix(config.DS_DECRYPT_STREAM_ENDPOINT, dataset_id, tuple(columns or ()), query)
     if offset:
-        params["offset"] = offset
+        url += f"&offset={int(offset)}"
     if limit is not None:
-        params["limit"] = limit
-
-    url = f"{config.DS_DECRYPT_STREAM_ENDPOINT}?{urlencode(params)}"
-
-    req = urllib.request.Request(url, method="GET")
-    req.add_header("Authorization", f"Bearer {token}")
-    req.add_header("Accept", "text/event-stream")
+        url += f"&limit={int(limit)}"
+
+    mode = config.DS_CACHE_MODE
+    if mode not in cache.MODES:
+        raise ValueError(f"DS_CACHE_MODE must be one of {', '.join(cache.MODES)}; got {mode!r}")
+    if mode == "disabled":
+        yield from _read_stream(url, token, limit, timeout, max_retries, pool)
+        return
+
+    key = cache.cache_key(url, token)
+    if mode != "write-only":
+        cached = cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+        if mode == "replay":
+            raise CacheMissError(f"No cached response for dataset {dataset_id!r} (DS_CACHE_MODE=replay)")
+
+    rows: List[Dict[str, Any]] = []
+    for row in _read_stream(url, token, limit, timeout, max_retries, pool):
+        rows.append(row)
+        yield row
+    # Only complete responses are stored; an abandoned iteration never gets here
+    cache.put(key, rows)
+
+
+def _read_stream(
+    url: str,
+    token: str,
+    limit: Optional[int],
+    timeout: int,
+    max_retries: int,
+    pool: Optional[ConnectionPool],
+) -> Iterator[Dict[str, Any]]:
+    """Send the decrypt-stream request and yield rows parsed from the SSE response."""
+    bucket = get_bucket()
+    if bucket is not None:
+        bucket.acquire(limit or 0)
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "text/event-stream",
+    }
 
     yielded = 0
     meta_columns: Optional[List[str]] = None
 
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec - trusted endpoint configured by operator
+        # Pooled keep-alive connection, so paged downloads skip repeated TCP/TLS handshakes
+        with (pool or default_pool).request(
+            "GET", url, headers=headers, timeout=timeout, retries=max_retries, decode_content=True
+        ) as resp:
+            if not 200 <= resp.status < 300:
+                body_text = ""
+                try:
+                    body_text = resp.read().decode("utf-8")
+                except Exception:
+                    pass
+                message = body_text or f"HTTP Error {resp.status}: {resp.reason}"
+                retry_after = None
+                if resp.status == 429:
+                    retry_after = retry_after_seconds(resp.headers.get("Retry-After"))
+                    if bucket is not None:
+                        bucket.penalize(retry_after)
+                raise_for_status(resp.status, message, retry_after)
+
             # Parse SSE: lines starting with "event:" or "data:", separated by blank line
             event_name: Optional[str] = None
-            data_lines: List[str] = []
+            # Data lines stay as bytes: the JSON parser takes UTF-8 directly,
+            # so no str copy of the payload is made
+            data_lines: List[bytes] = []
 
             def flush_event() -> Dict[str, Any]:
                 nonlocal event_name, data_lines, meta_columns, yielded, limit
                 if not event_name:
                     data_lines.clear()
                     return {"rows": [], "stop": False}
-                raw = "\n".join(data_lines).strip()
+                raw = data_lines[0] if len(data_lines) == 1 else b"\n".join(data_lines)
+                raw = raw.strip()
                 data_lines.clear()
                 try:
-                    payload = json.loads(raw) if raw else {}
+                    payload = json_loads(raw) if raw else {}
                 except Exception as e:
                     raise ParseError(f"Invalid SSE data JSON: {e}") from e
 
@@ -104,10 +191,11 @@ def decrypt_stream_iter(
                         elif isinstance(row, list):
                             if meta_columns is None:
                                 raise ParseError("Received list row before metadata with columns")
-                            row_dict = {
-                                col: row[idx] if idx < len(row) else None
-                                for idx, col in enumerate(meta_columns)
-                            }
+                            if len(row) >= len(meta_columns):
+                                row_dict = dict(zip(meta_columns, row))
+                            else:
+                                # Pad short rows with None for the missing trailing columns
+                                row_dict = dict(zip_longest(meta_columns, row))
                         else:
                             raise ParseError("chunk.rows[] must be dict or list")
                         if limit is None or yielded < limit:
@@ -132,25 +220,23 @@ def decrypt_stream_iter(
                 line_bytes = resp.readline()
                 if line_bytes == b"":  # EOF
                     break
-                try:
-                    line = line_bytes.decode("utf-8")
-                except Exception:
-                    # best-effort decoding
-                    line = line_bytes.decode("latin-1", errors="ignore")
-                line = line.rstrip("\r\n")
+                line = line_bytes.rstrip(b"\r\n")
                 if not line:
                     # event boundary
                     result = flush_event()
                     for r in result["rows"]:
                         yield r
                     if result["stop"]:
+                        # Consume the rest of the stream (normally just the done event) so the
+                        # connection can go back to the pool; drain() gives up on long tails
+                        resp.drain()
                         return
                     continue
-                if line.startswith("event:"):
-                    event_name = line[len("event:") :].strip()
+                if line.startswith(b"event:"):
+                    event_name = line[len(b"event:") :].strip().decode("utf-8", errors="replace")
                     continue
-                if line.startswith("data:"):
-                    data_lines.append(line[len("data:") :].lstrip())
+                if line.startswith(b"data:"):
+                    data_lines.append(line[len(b"data:") :].lstrip())
                     continue
                 # Ignore other fields like id:, retry:
 
@@ -160,21 +246,7 @@ def decrypt_stream_iter(
                 yield r
             if result["stop"]:
                 return
-    except urllib.error.HTTPError as e:  # type: ignore[attr-defined]
-        body_text = ""
-        try:
-            body_text = e.read().decode("utf-8")
-        except Exception:
-            pass
-        if e.code in (401, 403):
-            raise AuthError(body_text or str(e))
-        if e.code == 404:
-            raise NotFoundError(body_text or str(e))
-        if e.code == 429:
-            raise RateLimitError(body_text or str(e))
-        if 500 <= e.code < 600:
-            raise RemoteServerError(body_text or str(e))
-        raise NetworkError(body_text or str(e))
+    except (AuthError, NetworkError, NotFoundError, ParseError, RateLimitError, RemoteServerError):
+        raise
     except Exception as e:  # noqa: BLE001
         raise NetworkError(str(e))
-
@@ -4,7 +4,7 @@ Policy enforcement for data export.
 Note: Backend controls data visibility via runtime_key cipher.
 Client-side policy only enforces export limits.
 """
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TypeVar
 
 from . import config
 from .errors import PolicyViolationError
@@ -43,4 +43,34 @@ def enforce_export_policy(*, rows: Optional[int] = None) -> None:
         )
 
 
-__all__ = ["enforce_visibility_policy", "enforce_export_policy"]
+T = TypeVar("T")
+
+
+def enforce_export_policy_streaming(rows: Iterable[T]) -> Iterator[T]:
+    """
+    Enforce the export row limit on a lazily produced sequence of rows.
+
+    Rows are passed through unchanged; PolicyViolationError is raised as soon
+    as one row beyond the limit is pulled, so an export that would be rejected
+    stops before the source fetches any further pages.
+
+    Args:
+        rows: Iterable of rows (e.g. an IterableDataset or a row generator)
+
+    Yields:
+        The rows of `rows`, up to the configured limit
+
+    Raises:
+        PolicyViolationError: If the iterable produces more rows than allowed
+    """
+    max_rows = config.MAX_LOCAL_EXPORT_ROWS
+    for count, row in enumerate(rows, 1):
+        if count > max_rows:
+            raise PolicyViolationError(
+                f"Export exceeds limit: more than {max_rows} rows allowed. "
+                f"Set DS_MAX_LOCAL_EXPORT_ROWS environment variable to increase limit."
+            )
+        yield row
+
+
+__all__ = ["enforce_visibility_policy", "enforce_export_policy", "enforce_export_policy_streaming"]
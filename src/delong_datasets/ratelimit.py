@@ -0,0 +1,113 @@
+"""
+Client-side rate limiting.
+
+A token bucket keeps the client under the backend's request (DS_RPM) and row
+(DS_TPM) per-minute limits, so parallel downloads wait briefly on the client
+instead of collecting 429s and server-side backoff. Both default to 0 (off).
+
+When the server still answers 429, penalize() pauses the bucket for the
+Retry-After period and halves its rate; the rate recovers within a minute.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from . import config
+
+
+# Never slow down below this fraction of the configured rate
+_MIN_RATE_SCALE = 1 / 16
+
+
+class TokenBucket:
+    """Thread-safe token bucket for requests per minute and rows per minute."""
+
+    def __init__(self, rpm: float, tpm: float = 0) -> None:
+        """
+        Args:
+            rpm: Requests per minute (0 = unlimited)
+            tpm: Rows per minute (0 = unlimited)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._rows = float(tpm)
+        self._rate_scale = 1.0
+        self._paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if elapsed <= 0:
+            return
+        # Linear recovery: a halved rate is back to full after ~30s without 429s
+        self._rate_scale = min(1.0, self._rate_scale + elapsed / 60)
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm * self._rate_scale / 60)
+        if self.tpm:
+            self._rows = min(float(self.tpm), self._rows + elapsed * self.tpm * self._rate_scale / 60)
+
+    def acquire(self, rows: int = 0) -> None:
+        """
+        Block until one request (and `rows` rows) fit within the limits, then take them.
+
+        Args:
+            rows: Estimated rows the request will return (capped at the TPM bucket size)
+        """
+        if self.tpm:
+            rows = min(rows, int(self.tpm))
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    rate = self._rate_scale / 60
+                    wait = 0.0
+                    if self.rpm and self._requests < 1:
+                        wait = (1 - self._requests) / (self.rpm * rate)
+                    if self.tpm and self._rows < rows:
+                        wait = max(wait, (rows - self._rows) / (self.tpm * rate))
+                    if wait <= 0:
+                        if self.rpm:
+                            self._requests -= 1
+                        if self.tpm:
+                            self._rows -= rows
+                        return
+            time.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """
+        React to a 429: empty the bucket, halve the rate and pause for retry_after seconds.
+
+        Args:
+            retry_after: Server-provided delay in seconds, if any
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._rate_scale = max(self._rate_scale / 2, _MIN_RATE_SCALE)
+            self._requests = min(self._requests, 0.0)
+            self._rows = min(self._rows, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+_buckets: Dict[Tuple[int, int], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket() -> Optional[TokenBucket]:
+    """
+    Return the process-wide bucket for the current DS_RPM/DS_TPM, or None if both are 0.
+    """
+    key = (config.DS_RPM, config.DS_TPM)
+    if not any(key):
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(*key)
+        return bucket
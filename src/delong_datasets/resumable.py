@@ -1,88 +1,368 @@
+import hashlib
 import os
 import tempfile
-from typing import Dict, Iterable, Optional, Tuple
+from concurrent.futures import Future, as_completed, wait
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
 
 from . import config
+from .compat import json_dumps, json_loads
+from .connection import PooledResponse, default_pool, retry_after_seconds
+from .errors import IntegrityError, NetworkError, raise_for_status
+from .workers import get_executor
 
 
-def _http_head(url: str, headers: Dict[str, str], timeout: int) -> Tuple[int, Dict[str, str]]:
-    import urllib.request
+_MIN_CHUNK_SIZE = 8 * 1024 * 1024
+# Body reads start small and grow while each read fills the window, so slow
+# links are not held up filling a large buffer and fast ones reach ~1k
+# read/write calls per GiB
+_INITIAL_READ_SIZE = 64 * 1024
+_MAX_READ_SIZE = 1024 * 1024
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
 
-    req = urllib.request.Request(url, method="HEAD")
-    for k, v in headers.items():
-        req.add_header(k, v)
-    with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec - trusted endpoint configured by operator
-        status = resp.getcode()
-        # urllib on some servers may not return headers for HEAD; fallback to GET small range if needed in future
-        hdrs = {k.lower(): v for k, v in resp.headers.items()}  # type: ignore[attr-defined]
-        return status, hdrs
+
+def _open(method: str, url: str, headers: Dict[str, str], timeout: int) -> PooledResponse:
+    """
+    Send through the shared keep-alive pool, following redirects and raising on non-2xx (see raise_for_status).
+
+    A 416 with "Content-Range: bytes */0" is returned rather than raised: the
+    file is empty, so any range request is unsatisfiable (see _is_empty_file).
+    """
+    for _ in range(_MAX_REDIRECTS + 1):
+        resp = default_pool.request(method, url, headers=headers, timeout=timeout, retries=config.DS_MAX_RETRIES)
+        location = resp.headers.get("Location")
+        if resp.status in _REDIRECT_STATUSES and location:
+            resp.drain()
+            resp.close()
+            url = urljoin(url, location)
+            continue
+        if not 200 <= resp.status < 300 and not _is_empty_file(resp):
+            message = f"HTTP Error {resp.status}: {resp.reason}"
+            retry_after = retry_after_seconds(resp.headers.get("Retry-After"))
+            resp.close()
+            raise_for_status(resp.status, message, retry_after)
+        return resp
+    raise NetworkError(f"Too many redirects: {url}")
 
 
 def _http_get(
-    url: str, headers: Dict[str, str], timeout: int, range_start: Optional[int]
-) -> Tuple[int, Optional[int], Iterable[bytes]]:
-    import urllib.request
-
-    req = urllib.request.Request(url, method="GET")
-    for k, v in headers.items():
-        req.add_header(k, v)
-    if range_start is not None and range_start > 0:
-        req.add_header("Range", f"bytes={range_start}-")
-
-    resp = urllib.request.urlopen(req, timeout=timeout)  # nosec - endpoint controlled
-    status = resp.getcode()
-    length = resp.headers.get("Content-Length")  # type: ignore[attr-defined]
+    url: str,
+    headers: Dict[str, str],
+    timeout: int,
+    range_start: Optional[int],
+    range_end: Optional[int] = None,
+) -> Tuple[int, Optional[int], PooledResponse]:
+    """Returns (status, content_length, response); the caller reads and closes the response."""
+    if range_end is not None:
+        headers = {**headers, "Range": f"bytes={range_start or 0}-{range_end}"}
+    elif range_start is not None and range_start > 0:
+        headers = {**headers, "Range": f"bytes={range_start}-"}
+
+    resp = _open("GET", url, headers, timeout)
+    status = resp.status
+    length = resp.headers.get("Content-Length")
     try:
         length_int = int(length) if length is not None else None
     except Exception:
         length_int = None
+    return status, length_int, resp
+
+
+# netloc -> whether the server honoured Range last time, so later downloads
+# skip ranged requests to servers known to ignore them
+_range_support: Dict[str, bool] = {}
+
+
+class _RangeIgnored(Exception):
+    """The server answered a range request with the full body (200)."""
+
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    """Total size from a "bytes start-end/total" Content-Range header, if known."""
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _is_empty_file(resp: PooledResponse) -> bool:
+    """Whether resp is the 416 a server sends for a range request on a zero-byte file."""
+    return resp.status == 416 and _content_range_total(resp.headers.get("Content-Range")) == 0
+
+
+def _split_chunks(start: int, size: int, workers: int) -> List[Tuple[int, int]]:
+    """Split [start, size) into inclusive (start, end) ranges of at least _MIN_CHUNK_SIZE."""
+    chunk_size = max(_MIN_CHUNK_SIZE, -(-(size - start) // workers))
+    return [(pos, min(pos + chunk_size, size) - 1) for pos in range(start, size, chunk_size)]
+
+
+def _load_index(idx_path: str) -> Optional[Tuple[int, List[Tuple[int, int]], Set[int]]]:
+    """Return (size, chunks, done) from the sidecar, or None if it is missing or invalid."""
+    try:
+        with open(idx_path, "rb") as f:
+            state = json_loads(f.read())
+        size = int(state["size"])
+        chunks = [(int(a), int(b)) for a, b in state["chunks"]]
+        done = {int(i) for i in state["done"]}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+    # The chunks must tile [0, size) exactly
+    expected = 0
+    for a, b in chunks:
+        if a != expected or b < a:
+            return None
+        expected = b + 1
+    if expected != size or not done <= set(range(len(chunks))):
+        return None
+    return size, chunks, done
+
+
+def _save_index(idx_path: str, size: int, chunks: List[Tuple[int, int]], done: Set[int]) -> None:
+    tmp_path = idx_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json_dumps({"size": size, "chunks": chunks, "done": sorted(done)}))
+    os.replace(tmp_path, idx_path)
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """
+    Size fd to exactly size bytes so every chunk can be written at its own offset.
+
+    posix_fallocate reserves the blocks up front, giving the filesystem a
+    chance to lay the file out contiguously instead of growing it extent by
+    extent as out-of-order chunks land. Where it is unsupported (some
+    filesystems, non-Linux platforms) the file is just extended, sparsely.
+    """
+    if os.fstat(fd).st_size > size:
+        os.ftruncate(fd, size)
+    try:
+        os.posix_fallocate(fd, 0, size)
+        return
+    except (AttributeError, OSError):
+        pass
+    os.ftruncate(fd, size)
+
+
+def _iter_body(resp: PooledResponse) -> Iterator[memoryview]:
+    """
+    Yield the response body as views into one reusable buffer.
+
+    Each view is only valid until the next iteration; write it out before advancing.
+    """
+    view = memoryview(bytearray(_MAX_READ_SIZE))
+    size = _INITIAL_READ_SIZE
+    while True:
+        n = resp.readinto(view[:size])
+        if not n:
+            return
+        yield view[:n]
+        if n == size and size < _MAX_READ_SIZE:
+            size *= 2
+
+
+def _write_body(f: BinaryIO, resp: PooledResponse, hasher: Optional["hashlib._Hash"] = None) -> None:
+    """Write the response body to f, feeding it to hasher (if any) on the way."""
+    for block in _iter_body(resp):
+        f.write(block)
+        if hasher is not None:
+            hasher.update(block)
+
+
+def _hash_file(path: str, hasher: "hashlib._Hash") -> None:
+    """Feed the contents of path to hasher."""
+    view = memoryview(bytearray(_MAX_READ_SIZE))
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(view)
+            if not n:
+                return
+            hasher.update(view[:n])
+
+
+def _verify(part_path: str, hasher: "hashlib._Hash", expected_sha256: str) -> None:
+    """Raise IntegrityError (and discard the .part) if the digest does not match."""
+    digest = hasher.hexdigest()
+    if digest != expected_sha256.strip().lower():
+        os.remove(part_path)
+        raise IntegrityError(f"SHA256 mismatch: expected {expected_sha256}, got {digest}")
+
 
-    def _iter():
-        try:
-            while True:
-                chunk = resp.read(1024 * 64)
-                if not chunk:
-                    break
-                yield chunk
-        finally:
-            try:
-                resp.close()
-            except Exception:
-                pass
+def _pwrite_body(fd: int, resp: PooledResponse, start: int, end: int) -> None:
+    """Write the response body at [start, end] of fd, checking that it is complete."""
+    pos = start
+    for block in _iter_body(resp):
+        os.pwrite(fd, block, pos)
+        pos += len(block)
+    if pos != end + 1:
+        raise NetworkError(f"Incomplete range {start}-{end}: got {pos - start} bytes")
 
-    return status, length_int, _iter()
 
+def _parallel_download(url: str, headers: Dict[str, str], part_path: str, timeout: int, workers: int) -> bool:
+    """
+    Fetch the file as concurrent byte ranges written in place into part_path.
+
+    A fresh download starts with a single ranged GET for the first chunk; its
+    Content-Range gives the total size, and the rest is split across workers.
+    If that GET returns 200 instead, the full body is written as it arrives.
+    The chunk layout is recorded in part_path + ".idx" before the .part is
+    sized, and each completed chunk as it lands, so an interrupted download
+    resumes by fetching only the missing chunks, without a probe.
 
-def resumable_download(url: str, headers: Dict[str, str], dest_path: str) -> str:
+    Returns:
+        True when part_path is complete; False if the server stopped honouring
+        Range mid-download or gave no total size (caller restarts serially)
+    """
+    idx_path = part_path + ".idx"
+    state = _load_index(idx_path) if os.path.exists(part_path) else None
+    netloc = urlsplit(url).netloc
+
+    futures: Dict[Future, int] = {}
+    fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if state is None:
+            status, _length, resp = _http_get(url, headers, timeout, 0, _MIN_CHUNK_SIZE - 1)
+            with resp:
+                if status == 416:
+                    # Zero-byte file: nothing to fetch
+                    resp.drain()
+                    os.ftruncate(fd, 0)
+                    return True
+                if status != 206:
+                    # Range ignored: this is the whole file, so keep it
+                    _range_support[netloc] = False
+                    os.ftruncate(fd, 0)
+                    with open(fd, "wb", closefd=False) as f:
+                        _write_body(f, resp)
+                    return True
+                _range_support[netloc] = True
+                size = _content_range_total(resp.headers.get("Content-Range"))
+                if size is None:
+                    return False
+                first_end = min(_MIN_CHUNK_SIZE, size) - 1
+                chunks = [(0, first_end)] + _split_chunks(first_end + 1, size, workers)
+                # Index before the .part grows, so a failed first chunk resumes
+                # from the index rather than looking like a complete serial .part
+                done: Set[int] = set()
+                _save_index(idx_path, size, chunks, done)
+                _preallocate(fd, size)
+                _pwrite_body(fd, resp, 0, first_end)
+            done.add(0)
+            _save_index(idx_path, size, chunks, done)
+        else:
+            size, chunks, done = state
+            if os.fstat(fd).st_size != size:
+                _preallocate(fd, size)
+
+        def fetch(start: int, end: int) -> None:
+            status, _length, resp = _http_get(url, headers, timeout, start, end)
+            with resp:
+                if status != 206:
+                    raise _RangeIgnored()
+                _pwrite_body(fd, resp, start, end)
+
+        todo = [i for i in range(len(chunks)) if i not in done]
+        executor = get_executor()
+        futures = {executor.submit(fetch, *chunks[i]): i for i in todo}
+        error: Optional[BaseException] = None
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            exc = future.exception()
+            if exc is None:
+                done.add(futures[future])
+                _save_index(idx_path, size, chunks, done)
+            elif error is None:
+                # Stop queued chunks; ones already in flight finish and are recorded
+                error = exc
+                for f in futures:
+                    f.cancel()
+        if isinstance(error, _RangeIgnored):
+            return False
+        if error is not None:
+            raise error
+    finally:
+        # The executor is shared, so nothing else waits for these chunks: if the
+        # loop above is left early (e.g. _save_index fails, KeyboardInterrupt),
+        # drop the queued ones and let in-flight writes finish before the fd goes
+        for f in futures:
+            f.cancel()
+        wait(futures)
+        os.close(fd)
+
+    os.remove(idx_path)
+    return True
+
+
+def resumable_download(
+    url: str, headers: Dict[str, str], dest_path: str, expected_sha256: Optional[str] = None
+) -> str:
     """
     Download URL to dest_path with basic Range resume support.
-    - If dest_path.part exists, resume from its size when server supports Range (206).
+    - With DS_MAX_WORKERS > 1, the file is fetched as concurrent byte ranges;
+      progress is kept in dest_path.part.idx.
+    - Otherwise, if dest_path.part exists, resume from its size when server supports Range (206).
     - On 200 responses, restart from scratch.
+    There is no HEAD probe: range support is detected from the first GET and
+    remembered per host.
+
+    With expected_sha256, the file is verified before it is moved into place.
+    Serial downloads hash while writing (a resumed .part is hashed once on
+    startup); parallel downloads, whose chunks land out of order, are hashed
+    in one pass after assembly. On a mismatch the .part is discarded and
+    IntegrityError is raised.
     """
     part_path = dest_path + ".part"
+    idx_path = part_path + ".idx"
     timeout = config.DS_TIMEOUT
+    supports_range = _range_support.get(urlsplit(url).netloc, True)
 
     existing = 0
     if os.path.exists(part_path):
         existing = os.path.getsize(part_path)
 
-    # Probe server for range support (best-effort)
-    try:
-        status, hdrs = _http_head(url, headers, timeout)
-        accept_ranges = hdrs.get("accept-ranges", "").lower()
-        supports_range = "bytes" in accept_ranges or status == 200
-    except Exception:
-        supports_range = True  # fall back to try
+    workers = config.DS_MAX_WORKERS
+    parallel = (
+        supports_range
+        and workers > 1
+        and hasattr(os, "pwrite")
+        # A .part left by a serial download has no chunk index; keep resuming it serially
+        and (existing == 0 or os.path.exists(idx_path))
+    )
+    if parallel and _parallel_download(url, headers, part_path, timeout, workers):
+        if expected_sha256:
+            hasher = hashlib.sha256()
+            _hash_file(part_path, hasher)
+            _verify(part_path, hasher, expected_sha256)
+        os.replace(part_path, dest_path)
+        return dest_path
+    if parallel or os.path.exists(idx_path):
+        # A .part from the parallel path (preallocated, filled out of order) is
+        # not a valid prefix, even when its size looks complete; start over serially
+        existing = 0
+        for path in (part_path, idx_path):
+            if os.path.exists(path):
+                os.remove(path)
 
     range_start = existing if (existing > 0 and supports_range) else None
 
-    status, _length, stream = _http_get(url, headers, timeout, range_start)
+    status, _length, resp = _http_get(url, headers, timeout, range_start)
+    if range_start:
+        _range_support[urlsplit(url).netloc] = status in (206, 416)
 
     # If server ignores range and returns 200, we restart
     mode = "ab" if status == 206 and range_start else "wb"
-    with open(part_path, mode) as f:
-        for chunk in stream:
-            f.write(chunk)
+    hasher = hashlib.sha256() if expected_sha256 else None
+    if hasher is not None and mode == "ab":
+        _hash_file(part_path, hasher)
+    with resp, open(part_path, mode) as f:
+        if status == 416:
+            # Zero-byte file; the 416 body is not file content
+            resp.drain()
+        else:
+            _write_body(f, resp, hasher)
+    if hasher is not None:
+        _verify(part_path, hasher, expected_sha256)
 
     # Commit
     if os.path.exists(dest_path):
@@ -91,7 +371,7 @@ def resumable_download(url: str, headers: Dict[str, str], dest_path: str) -> str
     return dest_path
 
 
-def download_to_tempfile(url: str, headers: Dict[str, str]) -> str:
+def download_to_tempfile(url: str, headers: Dict[str, str], expected_sha256: Optional[str] = None) -> str:
     fd, path = tempfile.mkstemp(prefix="ds_resumable_", suffix=".bin")
     os.close(fd)
     # use path without relying on created empty file; resumable will write to path.part then move
@@ -100,6 +380,6 @@ def download_to_tempfile(url: str, headers: Dict[str, str]) -> str:
             os.remove(path)
     except Exception:
         pass
-    return resumable_download(url, headers, path)
+    return resumable_download(url, headers, path, expected_sha256)
 
 
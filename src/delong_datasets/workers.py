@@ -0,0 +1,42 @@
+"""
+Shared worker threads for parallel page and byte-range downloads.
+
+One process-wide ThreadPoolExecutor is reused across downloads instead of
+creating (and tearing down) a pool per call. Only leaf tasks -- a single HTTP
+request and its body -- may run on it: a task that submitted more work to the
+same executor and waited for it could deadlock once every thread is waiting.
+"""
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from . import config
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared executor, creating it on first use.
+
+    Its size is DS_DL_WORKERS (0 = DS_MAX_WORKERS), read once at creation.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                size = config.DS_DL_WORKERS or config.DS_MAX_WORKERS
+                _executor = ThreadPoolExecutor(max_workers=max(1, size), thread_name_prefix="ds-dl")
+    return _executor
+
+
+def _shutdown() -> None:
+    # Don't start queued downloads at interpreter exit; in-flight ones finish
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown)
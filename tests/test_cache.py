@@ -0,0 +1,83 @@
+import pytest
+
+from delong_datasets import config, metadata
+from delong_datasets.errors import CacheMissError
+from delong_datasets.metadata import decrypt_stream_iter
+
+
+ROWS = [{"id": 1, "score": float("nan")}, {"id": 2, "score": 10**20}]
+
+
+@pytest.fixture
+def fetches(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_read_stream(url, token, limit, timeout, max_retries, pool):
+        calls.append(url)
+        yield from ROWS
+
+    monkeypatch.setattr(metadata, "_read_stream", fake_read_stream)
+    monkeypatch.setenv("DS_DECRYPT_STREAM_ENDPOINT", "http://127.0.0.1:1/decrypt-stream")
+    monkeypatch.setenv("DS_CACHE_DIR", str(tmp_path))
+    yield calls
+    monkeypatch.undo()
+    config.reload_settings()
+
+
+def _set_mode(monkeypatch, mode):
+    monkeypatch.setenv("DS_CACHE_MODE", mode)
+    config.reload_settings()
+
+
+def _rows(**kwargs):
+    # repr() so NaN compares equal to itself
+    return repr(list(decrypt_stream_iter("ds", "token", **kwargs)))
+
+
+@pytest.mark.unit
+def test_disabled_always_fetches(fetches, monkeypatch, tmp_path):
+    _set_mode(monkeypatch, "disabled")
+    assert _rows() == repr(ROWS)
+    assert _rows() == repr(ROWS)
+    assert len(fetches) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.unit
+def test_enabled_serves_hits_from_disk(fetches, monkeypatch):
+    _set_mode(monkeypatch, "enabled")
+    assert _rows() == repr(ROWS)
+    assert _rows() == repr(ROWS)
+    assert len(fetches) == 1
+
+    # A different request is a different entry
+    assert _rows(offset=10) == repr(ROWS)
+    assert len(fetches) == 2
+
+
+@pytest.mark.unit
+def test_replay_never_fetches(fetches, monkeypatch):
+    _set_mode(monkeypatch, "replay")
+    with pytest.raises(CacheMissError):
+        _rows()
+
+    _set_mode(monkeypatch, "write-only")
+    _rows()
+    _set_mode(monkeypatch, "replay")
+    assert _rows() == repr(ROWS)
+    assert len(fetches) == 1
+
+
+@pytest.mark.unit
+def test_write_only_refreshes(fetches, monkeypatch):
+    _set_mode(monkeypatch, "write-only")
+    _rows()
+    _rows()
+    assert len(fetches) == 2
+
+
+@pytest.mark.unit
+def test_invalid_mode(fetches, monkeypatch):
+    _set_mode(monkeypatch, "sometimes")
+    with pytest.raises(ValueError):
+        _rows()
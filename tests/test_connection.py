@@ -0,0 +1,69 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from delong_datasets import config
+from delong_datasets.connection import ConnectionPool
+from delong_datasets.metadata import decrypt_stream_iter
+
+
+SSE_BODY = (
+    b'event: metadata\ndata: {"columns": ["id"]}\n\n'
+    b'event: chunk\ndata: {"rows": [[1], [2]]}\n\n'
+    b"event: done\ndata: {}\n\n"
+)
+
+
+class _SSEHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        body = SSE_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        if self.server.gzip:
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(params=[False, True], ids=["identity", "gzip"])
+def sse_server(request, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SSEHandler)
+    server.daemon_threads = True
+    server.gzip = request.param
+    server.connections = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setenv("DS_DECRYPT_STREAM_ENDPOINT", f"http://127.0.0.1:{server.server_port}/decrypt-stream")
+    config.reload_settings()
+    yield server
+    server.shutdown()
+    server.server_close()
+    monkeypatch.undo()
+    config.reload_settings()
+
+
+@pytest.mark.unit
+def test_content_length_sse_connection_is_reused(sse_server):
+    pool = ConnectionPool()
+    for _ in range(3):
+        rows = list(decrypt_stream_iter("ds", "token", pool=pool))
+        assert rows == [{"id": 1}, {"id": 2}]
+        assert sum(len(conns) for conns in pool._idle.values()) == 1
+    pool.clear()
+    assert sse_server.connections == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from delong_datasets import config, export_data
+from delong_datasets.errors import PolicyViolationError
+from delong_datasets.policy import enforce_export_policy, enforce_export_policy_streaming
+
+
+@pytest.fixture
+def max_rows(monkeypatch):
+    monkeypatch.setenv("DS_MAX_LOCAL_EXPORT_ROWS", "3")
+    config.reload_settings()
+    yield 3
+    monkeypatch.undo()
+    config.reload_settings()
+
+
+@pytest.mark.unit
+def test_enforce_export_policy(max_rows):
+    enforce_export_policy(rows=None)
+    enforce_export_policy(rows=max_rows)
+    with pytest.raises(PolicyViolationError):
+        enforce_export_policy(rows=max_rows + 1)
+
+
+@pytest.mark.unit
+def test_streaming_passes_rows_through(max_rows):
+    rows = [{"i": i} for i in range(max_rows)]
+    assert list(enforce_export_policy_streaming(rows)) == rows
+
+
+@pytest.mark.unit
+def test_streaming_stops_one_row_past_the_limit(max_rows):
+    pulled = []
+
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield {"i": i}
+
+    out = []
+    with pytest.raises(PolicyViolationError):
+        for row in enforce_export_policy_streaming(source()):
+            out.append(row)
+    assert len(out) == max_rows
+    assert len(pulled) == max_rows + 1
+
+
+@pytest.mark.unit
+def test_export_of_unsized_source_is_limited(max_rows, tmp_path):
+    path = tmp_path / "out.csv"
+    with pytest.raises(PolicyViolationError):
+        export_data(({"i": i} for i in range(10)), format="csv", path=str(path))
+
+    export_data(({"i": i} for i in range(max_rows)), format="csv", path=str(path))
+    assert path.read_text().splitlines() == ["i", "0", "1", "2"]
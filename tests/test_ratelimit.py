@@ -0,0 +1,92 @@
+import pytest
+
+from delong_datasets import config, ratelimit
+from delong_datasets.ratelimit import TokenBucket, get_bucket
+
+
+class _FakeTime:
+    """monotonic()/sleep() pair where sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeTime()
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
+
+
+@pytest.mark.unit
+def test_requests_within_burst_do_not_wait(clock):
+    bucket = TokenBucket(rpm=60)
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.slept == 0
+
+    bucket.acquire()
+    assert clock.slept == pytest.approx(1.0)
+
+
+@pytest.mark.unit
+def test_rows_per_minute(clock):
+    bucket = TokenBucket(rpm=0, tpm=100)
+    bucket.acquire(rows=80)
+    assert clock.slept == 0
+
+    # 60 more rows at 100 rows/minute
+    bucket.acquire(rows=80)
+    assert clock.slept == pytest.approx(36.0)
+
+
+@pytest.mark.unit
+def test_rows_are_capped_at_bucket_size(clock):
+    bucket = TokenBucket(rpm=0, tpm=100)
+    bucket.acquire(rows=10_000)
+    assert clock.slept == 0
+
+
+@pytest.mark.unit
+def test_penalize_pauses_and_slows_down(clock):
+    # Baseline: an emptied bucket refills at the full rate
+    bucket = TokenBucket(rpm=60)
+    for _ in range(60):
+        bucket.acquire()
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.slept == pytest.approx(6.0)
+
+    clock.slept = 0.0
+    bucket = TokenBucket(rpm=60)
+    bucket.penalize(retry_after=5)
+    assert bucket._rate_scale == 0.5
+    # Emptied, paused for Retry-After, then refilling at a reduced rate
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.slept > 6.0 + 3
+
+
+@pytest.mark.unit
+def test_get_bucket(monkeypatch):
+    monkeypatch.setenv("DS_RPM", "0")
+    monkeypatch.setenv("DS_TPM", "0")
+    config.reload_settings()
+    assert get_bucket() is None
+
+    monkeypatch.setenv("DS_RPM", "120")
+    config.reload_settings()
+    bucket = get_bucket()
+    assert bucket is not None and bucket.rpm == 120
+    assert get_bucket() is bucket
+
+    monkeypatch.undo()
+    config.reload_settings()
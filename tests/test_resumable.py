@@ -0,0 +1,201 @@
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from delong_datasets import config, resumable
+from delong_datasets.errors import IntegrityError, NetworkError, RemoteServerError
+
+
+CHUNK = 64 * 1024
+DATA = os.urandom(3 * CHUNK + 123)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        data = server.data
+        rng = self.headers.get("Range")
+        with server.lock:
+            server.requests.append(rng)
+        if not rng or not server.ranges:
+            self._send(200, data)
+            return
+        start, end = re.match(r"bytes=(\d+)-(\d*)", rng).groups()
+        start = int(start)
+        end = min(int(end), len(data) - 1) if end else len(data) - 1
+        if start >= len(data):
+            self._send(416, b"", {"Content-Range": f"bytes */{len(data)}"})
+            return
+        if start in server.fail_at:
+            self._send(500, b"")
+            return
+        body = data[start:end + 1]
+        extra = {"Content-Range": f"bytes {start}-{end}/{len(data)}"}
+        if server.drop_first:
+            # Promise the whole range, send part of it and hang up
+            server.drop_first = False
+            self._send(206, body[:1000], extra, length=len(body))
+            self.close_connection = True
+            return
+        self._send(206, body, extra)
+
+    def _send(self, status, body, headers=None, length=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body) if length is None else length))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    srv.daemon_threads = True
+    srv.data = DATA
+    srv.ranges = True
+    srv.fail_at = set()
+    srv.drop_first = False
+    srv.requests = []
+    srv.lock = threading.Lock()
+    srv.url = f"http://127.0.0.1:{srv.server_port}/file.bin"
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(resumable, "_MIN_CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(resumable, "_range_support", {})
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setenv("DS_MAX_WORKERS", "3")
+    monkeypatch.setenv("DS_MAX_RETRIES", "0")
+    config.reload_settings()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+    monkeypatch.undo()
+    config.reload_settings()
+
+
+def _set_workers(monkeypatch, workers):
+    monkeypatch.setenv("DS_MAX_WORKERS", str(workers))
+    config.reload_settings()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.unit
+def test_parallel_download(server, tmp_path):
+    dest = str(tmp_path / "file.bin")
+    assert resumable.resumable_download(server.url, {}, dest) == dest
+    assert _read(dest) == DATA
+    # First chunk alone (it reveals the size), then the rest in CHUNK-sized ranges
+    assert server.requests[0] == f"bytes=0-{CHUNK - 1}"
+    assert set(server.requests[1:]) == {
+        f"bytes={CHUNK}-{2 * CHUNK - 1}",
+        f"bytes={2 * CHUNK}-{3 * CHUNK - 1}",
+        f"bytes={3 * CHUNK}-{len(DATA) - 1}",
+    }
+    assert len(server.requests) == 4
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+@pytest.mark.unit
+def test_resume_from_index(server, tmp_path):
+    dest = str(tmp_path / "file.bin")
+    failed_start = 2 * CHUNK
+    server.fail_at = {failed_start}
+    with pytest.raises(RemoteServerError):
+        resumable.resumable_download(server.url, {}, dest)
+    assert os.path.exists(dest + ".part.idx")
+
+    server.fail_at = set()
+    server.requests.clear()
+    resumable.resumable_download(server.url, {}, dest)
+    assert _read(dest) == DATA
+    # Only the missing chunk is fetched again, without a probe
+    assert server.requests == [f"bytes={failed_start}-{3 * CHUNK - 1}"]
+    assert not os.path.exists(dest + ".part.idx")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [3, 1])
+def test_resume_after_interrupted_first_chunk(server, tmp_path, monkeypatch, workers):
+    dest = str(tmp_path / "file.bin")
+    server.drop_first = True
+    with pytest.raises(NetworkError):
+        resumable.resumable_download(server.url, {}, dest)
+    # The index exists before the .part is preallocated
+    assert os.path.exists(dest + ".part.idx")
+
+    _set_workers(monkeypatch, workers)
+    server.requests.clear()
+    resumable.resumable_download(server.url, {}, dest)
+    assert _read(dest) == DATA
+    if workers == 1:
+        # A parallel .part is never resumed serially
+        assert server.requests == [None]
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+@pytest.mark.unit
+def test_serial_resume_from_part(server, tmp_path, monkeypatch):
+    _set_workers(monkeypatch, 1)
+    dest = str(tmp_path / "file.bin")
+    with open(dest + ".part", "wb") as f:
+        f.write(DATA[:1000])
+    resumable.resumable_download(server.url, {}, dest, expected_sha256=hashlib.sha256(DATA).hexdigest())
+    assert _read(dest) == DATA
+    assert server.requests == ["bytes=1000-"]
+
+
+@pytest.mark.unit
+def test_range_ignored(server, tmp_path):
+    server.ranges = False
+    dest = str(tmp_path / "file.bin")
+    resumable.resumable_download(server.url, {}, dest)
+    assert _read(dest) == DATA
+    assert len(server.requests) == 1
+    assert resumable._range_support == {f"127.0.0.1:{server.server_port}": False}
+
+    # Known to ignore Range: the next download skips ranged requests
+    server.requests.clear()
+    resumable.resumable_download(server.url, {}, str(tmp_path / "again.bin"))
+    assert server.requests == [None]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [3, 1])
+def test_zero_byte_file(server, tmp_path, monkeypatch, workers):
+    _set_workers(monkeypatch, workers)
+    server.data = b""
+    dest = str(tmp_path / "empty.bin")
+    if workers == 1:
+        # Stale partial from an earlier version of the file
+        with open(dest + ".part", "wb") as f:
+            f.write(b"stale")
+    resumable.resumable_download(server.url, {}, dest, expected_sha256=hashlib.sha256(b"").hexdigest())
+    assert _read(dest) == b""
+    assert os.listdir(tmp_path) == ["empty.bin"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [3, 1])
+def test_sha256_mismatch(server, tmp_path, monkeypatch, workers):
+    _set_workers(monkeypatch, workers)
+    dest = str(tmp_path / "file.bin")
+    with pytest.raises(IntegrityError):
+        resumable.resumable_download(server.url, {}, dest, expected_sha256="0" * 64)
+    assert os.listdir(tmp_path) == []
+
+    resumable.resumable_download(server.url, {}, dest, expected_sha256=hashlib.sha256(DATA).hexdigest())
+    assert _read(dest) == DATA